@@ -8,10 +8,11 @@ from pickle import HIGHEST_PROTOCOL, Unpickler, dump
 from statistics import mean
 from typing import Optional
 
-import src
+from src.checkpoint import CHECKPOINT_INTERVAL
 from src.dataset import Dataset
 from src.decision_tree import DecisionTree
-from src.types import PicklePairs, PickleSeparation
+from src.scheduling import SubproblemCache
+from src.types import PickleSeparation
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,43 +24,83 @@ logger = logging.getLogger("decision_tree")
 
 def main(
         dataset_path: str,
-        dataset_pairs: Optional[PicklePairs],
         dataset_separation: Optional[PickleSeparation],
-        name: str
+        name: str,
+        epsilon: Optional[float] = None,
+        seed: Optional[int] = None,
+        workers: int = 1,
+        time_limit: Optional[float] = None,
+        max_nodes: Optional[int] = None,
+        max_memory: Optional[int] = None,
+        checkpoint_interval: Optional[float] = None
 ) -> None:
     """Inits dataset and runs the algorithm"""
     path = Path(dirname(__file__) + f"/{dataset_path}")
 
-    if dataset_pairs is not None and dataset_separation is not None:
-        dataset = Dataset(path, dataset_pairs, dataset_separation)
-    elif dataset_separation is None:
-        dataset = Dataset(path, dataset_pairs, None)
-    else:
-        dataset = Dataset(path)
-
-    # NOTE: 31/03/2023 - Since it happens to have structurally equal objects with different class label, we remove
-    #                    the most represented one. Doing so, we assure the purity of the leaves while keeping intact
-    #                    the variance of data
-    dataset.drop_equal_objects_with_different_class()
-
     folds_accuracies = {}
     folds_nodes = {}
     folds_heights = {}
 
     # Computes the indexes for each of the K folds
-    k_folded_dataset = dataset.k_fold_split(5)
+    # NOTE: The split is random, so with checkpoints the indexes of the folds are kept until all of them are fitted,
+    #       and an interrupted run resumes on the same folds, rebuilt on the dataset read again from its path
+    folds_path = dirname(__file__) + f"/model/{name}/folds.pkl"
+    if checkpoint_interval is not None and Path(folds_path).is_file():
+        with open(folds_path, "rb") as folds_file:
+            logger.info("Resuming on the folds of an interrupted run")
+            unpickler = Unpickler(folds_file)
+            folds = unpickler.load()
+
+        # NOTE: The folds only hold the objects kept when the run started, so the dataset is not deduplicated again
+        dataset = Dataset(Path(folds["dataset"]), dataset_separation)
+        k_folded_dataset = [
+            {"train": dataset.intersection(train), "test": dataset.intersection(test)}
+            for train, test in folds["indexes"]
+        ]
+    else:
+        dataset = Dataset(path, dataset_separation)
+
+        # NOTE: 31/03/2023 - Since it happens to have structurally equal objects with different class label, we remove
+        #                    the most represented one. Doing so, we assure the purity of the leaves while keeping intact
+        #                    the variance of data
+        dataset.drop_equal_objects_with_different_class()
+
+        k_folded_dataset = dataset.k_fold_split(5)
+
+        if checkpoint_interval is not None:
+            with open(folds_path, "wb") as folds_file:
+                dump(
+                    {
+                        "dataset": str(path),
+                        "indexes": [(fold["train"].indexes, fold["test"].indexes) for fold in k_folded_dataset]
+                    },
+                    folds_file,
+                    HIGHEST_PROTOCOL
+                )
+
+    # The folds share the subproblems built on the same objects
+    subproblems = SubproblemCache()
 
     for fold_number, fold in enumerate(k_folded_dataset, 1):
         logger.info("Training on fold: %i", fold_number)
-        src.TESTS = fold["train"].features
-        src.COSTS = fold["train"].costs
 
         with open(dirname(__file__) + f"/model/{name}/{fold_number}/train_set.pkl", "wb") as test_file:
             dump(fold["train"], test_file, HIGHEST_PROTOCOL)
 
+        # Resumes the fit of the i-th training fold from its checkpoint, if any
+        checkpoint_path = dirname(__file__) + f"/model/{name}/{fold_number}/checkpoint.pkl"
+        resume_from = checkpoint_path if checkpoint_interval is not None and Path(checkpoint_path).is_file() else None
+
         # Fits the decision tree on the i-th training fold
         decision_tree = DecisionTree()
-        decision_tree.fit(fold["train"], src.TESTS, src.COSTS, name, fold_number)
+        decision_tree.fit(
+            fold["train"], fold["train"].features, fold["train"].costs, name, fold_number, epsilon, seed, workers,
+            subproblems=subproblems, time_limit=time_limit, max_nodes=max_nodes,
+            max_memory=None if max_memory is None else max_memory * 2 ** 20,
+            checkpoint_path=None if checkpoint_interval is None else checkpoint_path,
+            checkpoint_interval=CHECKPOINT_INTERVAL if checkpoint_interval is None else checkpoint_interval,
+            resume_from=resume_from
+        )
 
         with open(dirname(__file__) + f"/model/{name}/{fold_number}/pruned.pkl", "wb") as tree_file:
             dump(decision_tree, tree_file, HIGHEST_PROTOCOL)
@@ -83,6 +124,9 @@ def main(
         folds_nodes[fold_number] = decision_tree.number_of_nodes()
         folds_heights[fold_number] = decision_tree.height()
 
+    if checkpoint_interval is not None:
+        Path(folds_path).unlink()
+
     logger.info("Mean accuracy over 5 folds: %.2f", mean(folds_accuracies.values()))
     logger.info("Mean number of nodes over 5 folds: %i", ceil(mean(folds_nodes.values())))
     logger.info("Mean height over 5 folds: %i", ceil(mean(folds_heights.values())))
@@ -92,24 +136,45 @@ def main(
 if __name__ == "__main__":
     parser = ArgumentParser(prog="main.py", description="Builds (log-)optimal decision trees")
     parser.add_argument("-f", "--filename", type=str, help="The CSV file containing the dataset")
+    parser.add_argument(
+        "-e", "--epsilon", type=float, default=None,
+        help="Approximation loss of the stochastic greedy heuristic (exhaustive greedy if not given)"
+    )
+    parser.add_argument("-s", "--seed", type=int, default=None, help="Seed of the stochastic greedy heuristic")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="Number of processes probing budgets at the same time with -e (plain binary search if 1)"
+    )
+    parser.add_argument(
+        "-t", "--time-limit", type=float, default=None,
+        help="Seconds after which the pending subproblems of a fold are closed as majority-class leaves"
+    )
+    parser.add_argument(
+        "-n", "--max-nodes", type=int, default=None,
+        help="Number of nodes after which the pending subproblems of a fold are closed as majority-class leaves"
+    )
+    parser.add_argument(
+        "-m", "--max-memory", type=int, default=None,
+        help="Peak memory in MiB after which the pending subproblems of a fold are closed as majority-class leaves"
+    )
+    parser.add_argument(
+        "-c", "--checkpoint-interval", type=float, default=None,
+        help="Seconds between two checkpoints of the fit of a fold, resumed from if present (no checkpoints if not "
+             "given). A checkpoint is only valid for the same options."
+    )
 
     args = parser.parse_args()
 
     dataset_name = args.filename.replace('data/datasets/csv/', '').replace('.csv', '')
-    pairs = None
     separation = None
 
-    if Path(dirname(__file__) + f"/data/pairs/{dataset_name}_pairs.pkl").is_file():
-        with open(dirname(__file__) + f"/data/pairs/{dataset_name}_pairs.pkl", "rb") as pairs_f:
-            logger.info("Loading pairs from Pickle file")
-            unpickler = Unpickler(pairs_f)
-            pickle_pairs: PicklePairs = unpickler.load()
-            pairs = pickle_pairs["pairs"]
-
     if Path(dirname(__file__) + f"/data/separation/{dataset_name}_separation.pkl").is_file():
         with open(dirname(__file__) + f"/data/separation/{dataset_name}_separation.pkl", "rb") as separation_f:
             logger.info("Loading separation from Pickle file")
             unpickler = Unpickler(separation_f)
             separation: PickleSeparation = unpickler.load()
 
-    main(args.filename, pairs, separation, dataset_name)
+    main(
+        args.filename, separation, dataset_name, args.epsilon, args.seed, args.workers,
+        args.time_limit, args.max_nodes, args.max_memory, args.checkpoint_interval
+    )
@@ -2,6 +2,7 @@
 
 Classes:
     Dataset
+    ObjectSet
     Separation
 
 Functions:
@@ -11,7 +12,4 @@ Functions:
     wolsey_greedy_heuristic
     submodular_function_1
 """
-TESTS = []
-COSTS = {}
-
 MAX_DEPTH = 7
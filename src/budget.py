@@ -1,7 +1,10 @@
 import logging
+from concurrent.futures import Executor
+from functools import partial
+from typing import Callable, Optional
 
 from src.dataset import Dataset
-from src.heuristic import wolsey_greedy_heuristic
+from src.heuristic import BreakpointWolseyHeuristic, wolsey_greedy_heuristic
 from src.types import Bounds
 from src.utils import binary_search_budget
 
@@ -11,7 +14,13 @@ logger = logging.getLogger("decision_tree")
 def find_budget(
         dataset: Dataset,
         tests: list[str],
-        costs: dict[str, float]
+        costs: dict[str, float],
+        epsilon: Optional[float] = None,
+        seed: Optional[int] = None,
+        workers: int = 1,
+        upper_bound: Optional[float] = None,
+        executor: Optional[Executor] = None,
+        stop: Optional[Callable[[], bool]] = None
 ) -> float:
     """Finds the optimal threshold for tests costs during decision tree creation.
 
@@ -19,12 +28,39 @@ def find_budget(
         dataset (Dataset): The dataset on which the procedure is running
         tests (list[str]): The tests for the given dataset
         costs (dict[str, float]): The costs for the tests
+        epsilon (Optional[float], optional): If given, the heuristic runs the stochastic greedy with this
+            approximation loss. Defaults to None.
+        seed (Optional[int], optional): Seed of the stochastic greedy. Defaults to None.
+        workers (int, optional): Number of budgets probed at the same time by the stochastic greedy. Defaults to 1.
+        upper_bound (Optional[float], optional): If given, tightens the upper bound of the search, which is the
+            total cost otherwise. Defaults to None.
+        executor (Optional[Executor], optional): Pool started by budget_executor, in which the budgets are probed.
+            Defaults to None.
+        stop (Optional[Callable[[], bool]], optional): Checked before each round of probes, ending the search early
+            once it is true. Defaults to None.
 
     Returns:
         float: The optimal budget for the decision tree test costs
     """
-    logger.info(f"Starting budget computation | Lower bound: 1.0 | Upper bound: {dataset.total_cost}")
-    search_bounds = Bounds(1.0, dataset.total_cost)
-    return binary_search_budget(
-        dataset, tests, costs, search_bounds, wolsey_greedy_heuristic
+    upper = dataset.total_cost if upper_bound is None else min(upper_bound, dataset.total_cost)
+    logger.info(f"Starting budget computation | Lower bound: 1.0 | Upper bound: {upper}")
+    search_bounds = Bounds(1.0, upper)
+    # NOTE: The stochastic greedy samples anew at each probe, so it cannot share the greedy among the probes. The
+    #       exhaustive one runs its greedy once for all of them, after which a probe is a lookup: it is never sent to
+    #       the executor, whose workers would each run the greedy again.
+    heuristic = BreakpointWolseyHeuristic()
+    if epsilon is not None:
+        heuristic = partial(wolsey_greedy_heuristic, epsilon=epsilon, seed=seed)
+    else:
+        executor = None
+
+    budget = binary_search_budget(
+        dataset, tests, costs, search_bounds, heuristic, workers, executor, stop
+    )
+    if isinstance(heuristic, BreakpointWolseyHeuristic):
+        logger.debug("Greedy runs for the budget search: %i", heuristic.runs)
+    logger.debug(
+        "Intersections cache: %i hits, %i misses", dataset.intersections.hits, dataset.intersections.misses
     )
+
+    return budget
@@ -0,0 +1,143 @@
+import logging
+import os
+from pickle import HIGHEST_PROTOCOL, UnpicklingError, dump, load
+from time import monotonic
+from typing import Any, BinaryIO, Optional
+from uuid import UUID
+
+from src.scheduling import BuildTask
+from src.tree import Tree
+
+logger = logging.getLogger("decision_tree")
+
+# Default number of seconds between two writes of a checkpoint
+CHECKPOINT_INTERVAL = 60.0
+
+# (parent, edge label, nodes, edges, subproblems) of a subtree grafted on the tree, the parent being None for the root
+Record = tuple[Optional[UUID], Optional[str], list, list, list[BuildTask]]
+
+
+class BuildCheckpoint:
+    """Append-only log of the subtrees built by DecisionTree.fit, from which an interrupted fit can be resumed
+
+    The file starts with a header identifying the build, followed by batches of records, one for each subtree grafted
+    on the tree with the subproblems left out of it. Only the records of the last interval are written at a time, so
+    the cost of a checkpoint does not grow with the tree, and the dataset is never written: the subproblems only keep
+    their objects. A pending subproblem is identified by its parent node and edge label, so the pending subproblems
+    are the ones not yet grafted when the records are read back.
+    """
+
+    path: str
+    interval: float
+    _file: BinaryIO
+    _last_write: float
+    _records: list[Record]
+
+    def __init__(
+            self,
+            path: str,
+            header: dict[str, Any],
+            interval: float = CHECKPOINT_INTERVAL,
+            state: Optional[tuple[Tree, list[BuildTask]]] = None
+    ) -> None:
+        """Starts a checkpoint, replacing the file at the given path
+
+        Args:
+            path (str): The path of the checkpoint
+            header (dict[str, Any]): What identifies the build
+            interval (float, optional): Seconds between two writes. Defaults to CHECKPOINT_INTERVAL.
+            state (Optional[tuple[Tree, list[BuildTask]]], optional): The tree and the pending subproblems of a
+                resumed build, written as a single record. Defaults to None.
+        """
+        self.path = path
+        self.interval = interval
+        self._records = [] if state is None else [self._as_record(None, *state)]
+
+        # NOTE: The file is replaced at once, so that the checkpoint a build is resumed from is never lost
+        with open(f"{path}.tmp", "wb") as checkpoint_file:
+            dump(header, checkpoint_file, HIGHEST_PROTOCOL)
+            self._write(checkpoint_file)
+        os.replace(f"{path}.tmp", path)
+
+        self._file = open(path, "ab")
+        self._last_write = monotonic()
+
+    def record(self, task: Optional[BuildTask], subtree: Tree, subtasks: list[BuildTask]) -> None:
+        """Adds a subtree grafted on the tree, writing the checkpoint if the interval has passed
+
+        Args:
+            task (Optional[BuildTask]): The subproblem of the subtree, None for the root of the tree
+            subtree (Tree): The subtree
+            subtasks (list[BuildTask]): The subproblems left out of the subtree
+        """
+        self._records.append(self._as_record(task, subtree, subtasks))
+
+        if monotonic() - self._last_write >= self.interval:
+            self._write(self._file)
+            self._last_write = monotonic()
+
+    def close(self) -> None:
+        self._write(self._file)
+        self._file.close()
+
+    @staticmethod
+    def _as_record(task: Optional[BuildTask], subtree: Tree, subtasks: list[BuildTask]) -> Record:
+        return (
+            None if task is None else task.parent,
+            None if task is None else task.label,
+            list(subtree.structure.nodes(data=True)),
+            list(subtree.structure.edges(data=True)),
+            subtasks
+        )
+
+    def _write(self, checkpoint_file: BinaryIO) -> None:
+        if len(self._records) == 0:
+            return
+
+        # NOTE: A batch is a single pickle, so a write interrupted halfway only loses its own records
+        dump(self._records, checkpoint_file, HIGHEST_PROTOCOL)
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+
+        logger.debug("Checkpoint of %i subtrees written to %s", len(self._records), self.path)
+        self._records = []
+
+    @staticmethod
+    def load(path: str) -> tuple[dict[str, Any], Optional[Tree], list[BuildTask]]:
+        """Reads a checkpoint back
+
+        Args:
+            path (str): The path of the checkpoint
+
+        Returns:
+            tuple[dict[str, Any], Optional[Tree], list[BuildTask]]: The header, the tree built so far (None if not even
+                its root was written) and the pending subproblems, in the order they were found
+        """
+        tree: Optional[Tree] = None
+        pending: dict[tuple[Optional[UUID], Optional[str]], BuildTask] = {}
+
+        with open(path, "rb") as checkpoint_file:
+            header = load(checkpoint_file)
+
+            while True:
+                try:
+                    records: list[Record] = load(checkpoint_file)
+                except (EOFError, UnpicklingError):
+                    break
+
+                for parent, label, nodes, edges, subtasks in records:
+                    subtree = Tree()
+                    subtree.structure.add_nodes_from(nodes)
+                    subtree.structure.add_edges_from(edges)
+
+                    if parent is None:
+                        tree = subtree
+                    else:
+                        tree.add_subtree(parent, subtree, label)
+                        del pending[(parent, label)]
+
+                    for subtask in subtasks:
+                        pending[(subtask.parent, subtask.label)] = subtask
+
+        logger.info("Resuming from a checkpoint with %i pending subproblems", len(pending))
+        return header, tree, list(pending.values())
@@ -1,21 +1,32 @@
 import logging
-from collections import Counter
-from copy import deepcopy
+from collections import OrderedDict
+from copy import copy, deepcopy
 from dataclasses import dataclass, field
 from functools import cached_property, reduce
-from itertools import chain, combinations
+from itertools import chain
 from math import fsum
+from operator import and_
 from pathlib import Path
-from pickle import HIGHEST_PROTOCOL, dump
+from pickle import HIGHEST_PROTOCOL, dump, load
 from random import randint
-from typing import Any, Literal, Optional, Self
+from threading import Lock
+from typing import Any, Iterable, Iterator, Literal, Mapping, Optional, Self
 
 import numpy as np
 import pandas as pd
 from sklearn.model_selection import KFold
 
+from src.kernels import class_histograms, code_dtype, pairs_from_histograms
+from src.object_set import MaskedObjectSets, ObjectSet
+
 logger = logging.getLogger("decision_tree")
 
+# Maximum number of (feature, object) cells processed at once by Dataset.S_star_statistics
+STATISTICS_BLOCK_SIZE = 1 << 24
+
+# Maximum number of intersections ∩ S[*][feature] kept by Dataset.intersections
+INTERSECTION_CACHE_SIZE = 256
+
 
 @dataclass(init=False, repr=False)
 class Dataset:
@@ -23,44 +34,139 @@ class Dataset:
 
     @dataclass(init=False)
     class Pairs:
-        """A tuple of items having different classes"""
+        """The pairs of items having different classes
+
+        The pairs are never materialized: two objects form a pair if and only if they belong to different blocks of
+        the partition of the objects by class, so the partition alone is enough to count, iterate and check them.
+        The partition is stored as an integer class code for each object, so that the number of pairs inside any
+        subset of objects comes from its class histogram. The pairs restricted to a subset share the class codes of
+        the whole dataset and only keep the sorted indexes of the subset, so that they cost O(|subset|).
+        """
 
-        pairs_list: list[tuple[int, int]]
+        _class_codes: np.ndarray
+        _histogram: np.ndarray
+        # Sorted indexes of the objects the pairs are restricted to, None for all the objects with a class code
+        _members: Optional[np.ndarray] = None
 
-        def __init__(self, dataset: np.ndarray, name: Optional[str] = None) -> None:
+        def __init__(self, indexes: Iterable[int], classes: Iterable[Any]) -> None:
             logger.debug("Computing dataset pairs")
-            if dataset.shape[0] == 1:
-                self.pairs_list = []
-                return
+            indexes = np.fromiter(indexes, dtype=np.int64)
 
-            self.pairs_list = list(
-                filter(
-                    lambda pair: dataset[pair[0], -2] != dataset[pair[1], -2],
-                    combinations(dataset[:, 0], 2)
-                )
-            )
+            if not isinstance(classes, np.ndarray):
+                classes = np.asarray(list(classes), dtype="object")
+            codes = np.unique(classes, return_inverse=True)[1] if len(classes) else np.array([], dtype=np.int64)
 
-            # Saves the pairs, so we don't need to recompute them in future executions
-            if name is not None and not Path(f"./data/pairs/{name}_pairs.pkl").is_file():
-                with open(f"./data/pairs/{name}_pairs.pkl", "wb") as f:
-                    dump({"pairs": self.pairs_list}, f, HIGHEST_PROTOCOL)  # type: ignore
+            # Code -1 marks the objects not in the dataset
+            self._class_codes = np.full(indexes.max(initial=-1) + 1, -1, dtype=np.int64)
+            self._class_codes[indexes] = codes
+            self._histogram = np.bincount(codes, minlength=codes.max(initial=-1) + 1)
 
-        @classmethod
-        def from_precomputed(cls, pairs: list[tuple[int]]) -> Self:
-            """Constructs a Pairs object from the pre-computed pickled file
+        def __contains__(self, pair: tuple[int, int]) -> bool:
+            obj1, obj2 = pair
+            if not (0 <= obj1 < len(self._class_codes) and 0 <= obj2 < len(self._class_codes)):
+                return False
+
+            code1, code2 = self._codes_of(np.array([obj1, obj2], dtype=np.int64)).tolist()
+            return code1 != -1 and code2 != -1 and code1 != code2
+
+        def __iter__(self) -> Iterator[tuple[int, int]]:
+            """Lazily yields the pairs, in the same order as itertools.combinations over the objects"""
+            objects = np.flatnonzero(self._class_codes != -1) if self._members is None else self._members
+            codes = self._class_codes[objects]
+            objects, codes = objects[codes != -1], codes[codes != -1]
+
+            for position, obj1 in enumerate(objects.tolist()):
+                successors = objects[position + 1:]
+                for obj2 in successors[codes[position + 1:] != codes[position]].tolist():
+                    yield obj1, obj2
+
+        @staticmethod
+        def _indexes_of(objects: ObjectSet | Iterable[int]) -> np.ndarray:
+            if isinstance(objects, ObjectSet):
+                return objects.to_array()
+
+            return np.asarray(objects, dtype=np.int64)
+
+        def _codes_of(self, objects: np.ndarray) -> np.ndarray:
+            """Class codes of the given objects, -1 for the ones without a pair"""
+            codes = self._class_codes[objects]
+            if self._members is None:
+                return codes
+
+            positions = np.searchsorted(self._members, objects)
+            members = positions < len(self._members)
+            members[members] = self._members[positions[members]] == objects[members]
+
+            return np.where(members, codes, -1)
+
+        def drop_many(self, indexes: Iterable[int]) -> None:
+            """Removes many objects at once, together with all the pairs containing them
+
+            Args:
+                indexes (Iterable[int]): Indexes of the (distinct) objects to remove
+            """
+            indexes = np.asarray(indexes, dtype=np.int64)
+
+            codes = self._codes_of(indexes)
+            self._histogram -= np.bincount(codes[codes != -1], minlength=len(self._histogram))
+            if self._members is None:
+                self._class_codes[indexes] = -1
+            else:
+                # The class codes are shared with the whole dataset
+                self._members = np.setdiff1d(self._members, indexes, assume_unique=True)
+
+        def number_for(self, objects: ObjectSet | Iterable[int]) -> int:
+            """Number of pairs having both the items in objects
 
             Args:
-                pairs: The pre-computed Pairs object
+                objects (ObjectSet | Iterable[int]): The (distinct) objects to be checked
 
             Returns:
-                An instance of Pairs from the pre-computed object
+                int: Number of pairs
             """
-            # NOTE: This is a workaround to construct a Pairs object without an explicit call to the constructor.
-            #       Needed since we allow a pre-computation of the pairs for the dataset, giving it as an input to
-            #       the procedure.
-            pairs_obj = cls(np.array([1]))
-            pairs_obj.pairs_list = pairs
-            return pairs_obj
+            codes = self._codes_of(self._indexes_of(objects))
+            codes = codes[codes != -1]
+
+            return int(pairs_from_histograms(np.bincount(codes, minlength=len(self._histogram))))
+
+        def number_for_many(self, subsets: list[ObjectSet | Iterable[int]]) -> np.ndarray:
+            """Number of pairs having both the items in each of the subsets, computed in a single pass
+
+            Args:
+                subsets (list[ObjectSet | Iterable[int]]): The (distinct) objects of each subset
+
+            Returns:
+                np.ndarray: Number of pairs of each subset
+            """
+            subsets = [self._indexes_of(objects) for objects in subsets]
+            if len(subsets) == 0:
+                return np.array([], dtype=np.int64)
+
+            subset_ids = np.repeat(np.arange(len(subsets)), [len(objects) for objects in subsets])
+            codes = self._codes_of(np.concatenate(subsets))
+            present = codes != -1
+
+            histograms = class_histograms(codes[present], subset_ids[present], len(subsets), len(self._histogram))
+            return pairs_from_histograms(histograms)
+
+        def restricted_to(self, objects: ObjectSet) -> Self:
+            """The pairs having both the items in objects
+
+            Args:
+                objects (ObjectSet): The objects to keep
+
+            Returns:
+                Pairs: The pairs among the given objects
+            """
+            pairs = copy(self)
+            pairs._members = objects.to_array()
+            if self._members is not None:
+                pairs._members = np.intersect1d(pairs._members, self._members, assume_unique=True)
+
+            codes = self._class_codes[pairs._members]
+            pairs._histogram = np.bincount(codes[codes != -1], minlength=len(self._histogram))
+
+            return pairs
 
         @property
         def number(self) -> int:
@@ -69,18 +175,31 @@ class Dataset:
             Returns:
                 int: The total number of pairs for the dataset
             """
-            return len(self.pairs_list)
+            return int(pairs_from_histograms(self._histogram))
 
     @dataclass(init=False)
     class Separation:
+        """The separation of the objects induced by each feature
+
+        For each feature t, the pairs kept by t have both the objects in sigma_t, while the pairs separated by t have
+        exactly one of them in sigma_t. The pairs are never stored: the separation only keeps, for each feature, the
+        label code of each object and the code of the label of S^*_t, so that the number of kept and separated pairs
+        are computed once, while membership of a pair is checked on demand from the codes of its two objects.
+        """
+
         _all_features: list[str]
+        _class_codes: np.ndarray
+        _classes_number: int
+        _size: int
 
-        S_label: dict[str, dict[str, list[int]]] = field(default_factory=dict)
-        S_star: dict[str, list[int]] = field(default_factory=dict)
-        sigma: dict[str, list[int]] = field(default_factory=dict)
+        S_label: dict[str, dict[str, ObjectSet]] = field(default_factory=dict)
+        S_star: dict[str, ObjectSet] = field(default_factory=dict)
+        sigma: dict[str, ObjectSet] = field(default_factory=dict)
 
-        kept: dict[str, list[tuple[int]]] = field(default_factory=dict)
-        separated: dict[str, list[tuple[int]]] = field(default_factory=dict)
+        label_codes: dict[str, np.ndarray] = field(default_factory=dict)
+        star_codes: dict[str, int] = field(default_factory=dict)
+        kept_number: dict[str, int] = field(default_factory=dict)
+        separated_number: dict[str, int] = field(default_factory=dict)
 
         def __init__(self, dataset: 'Dataset', name: Optional[str] = None) -> None:
             if not dataset._path:
@@ -90,89 +209,187 @@ class Dataset:
             self.S_label = {}
             self.S_star = {}
             self.sigma = {}
-            self.kept = {}
-            self.separated = {}
+            self.label_codes = {}
+            self.star_codes = {}
+            self.kept_number = {}
+            self.separated_number = {}
 
             self._all_features = dataset.features
+            self._class_codes = dataset._pairs._class_codes.copy()
+            self._classes_number = len(dataset._pairs._histogram)
+            self._size = dataset._size
 
-            for feature_idx, feature in enumerate(self._all_features):
+            objects = dataset.objects
+            indexes = dataset.indexes.astype(np.int64)
+
+            for feature in self._all_features:
+                # The columns of the dataset are already factorized, each label being identified by an integer code
+                labels, label_codes = dataset._labels[feature], dataset._columns[feature]
+
+                self.label_codes[feature] = np.zeros(self._size, dtype=label_codes.dtype)
+                self.label_codes[feature][indexes] = label_codes
+
+                # Groups the objects by label code
+                groups = np.split(
+                    indexes[np.argsort(label_codes, kind="stable")],
+                    np.cumsum(np.bincount(label_codes, minlength=len(labels)))[:-1]
+                )
                 self.S_label[feature] = {
-                    str(value): [item[0] for item in dataset.data() if item[feature_idx + 1] == value]
-                    for value in set(dataset.data()[:, feature_idx + 1])
+                    str(label): ObjectSet.from_indexes(group, self._size) for label, group in zip(labels, groups)
                 }
 
-                feature_pairs = {
-                    label: dataset.pairs_number_for(objects) for label, objects in self.S_label[feature].items()
-                }
-                # type: ignore
-                max_pairs = max(feature_pairs, key=feature_pairs.get)
-                self.S_star[feature] = self.S_label[feature][max_pairs]
-
-                self.sigma[feature] = [row[0] for row in dataset.difference(self.S_star[feature])]
-
-                self.kept[feature] = list(
-                    filter(
-                        lambda pair: all(
-                            idx in self.sigma[feature] for idx in pair),
-                        dataset.pairs_list
-                    )
-                )
+                # S^*_t is the label whose objects contain the most pairs
+                self.star_codes[feature] = self._star_code(feature)
 
-                self.separated[feature] = list(
-                    filter(
-                        lambda pair: pair[0] in self.sigma[feature] and pair[1] in self.S_star[feature] or
-                        pair[1] in self.sigma[feature] and pair[0] in self.S_star[feature],
-                        dataset.pairs_list
-                    )
-                )
+                self.S_star[feature] = self.S_label[feature][str(labels[self.star_codes[feature]])]
+                self.sigma[feature] = objects - self.S_star[feature]
+
+                self.kept_number[feature], self.separated_number[feature] = self._pairs_numbers(feature)
 
-            # Saves the pairs, so we don't need to recompute them in future executions
+            # Saves the separation, so we don't need to recompute it in future executions
             if name is not None and not Path(f"./data/separation/{name}_separation.pkl").is_file():
-                with open(f"./data/separation/{name}_separation.pkl", "wb") as f:
-                    dump(  # type: ignore
-                        {
-                            "S_label": self.S_label,
-                            "S_star": self.S_star,
-                            "sigma": self.sigma,
-                            "separated": self.separated,
-                            "kept": self.kept
-                        },
-                        f,
-                        HIGHEST_PROTOCOL
-                    )
-
-        def __getitem__(self, key: str) -> dict[Any, list[int]]:
+                self.save(Path(f"./data/separation/{name}_separation.pkl"))
+
+        def save(self, path: Path) -> None:
+            """Pickles the separation, in the format read back by from_precomputed
+
+            Args:
+                path (Path): The path of the pickled separation
+            """
+            with open(path, "wb") as f:
+                dump(  # type: ignore
+                    {
+                        "S_label": self.S_label,
+                        "S_star": self.S_star,
+                        "sigma": self.sigma,
+                        "label_codes": self.label_codes,
+                        "star_codes": self.star_codes,
+                        "separated_number": self.separated_number,
+                        "kept_number": self.kept_number
+                    },
+                    f,
+                    HIGHEST_PROTOCOL
+                )
+
+        def __getitem__(self, key: str) -> dict[Any, ObjectSet]:
             return self.S_label[key]
 
+        @staticmethod
+        def saved(name: str) -> Optional[dict[str, Any]]:
+            """Reads the separation saved for a dataset, if any
+
+            Args:
+                name (str): The name of the dataset
+
+            Returns:
+                Optional[dict[str, Any]]: The pickled separation, None if it was never saved
+            """
+            path = Path(f"./data/separation/{name}_separation.pkl")
+            if not path.is_file():
+                return None
+
+            with open(path, "rb") as f:
+                return load(f)
+
         @classmethod
         def from_precomputed(
                 cls,
                 separation: dict[
-                    Literal["S_label", "S_star", "sigma", "separated", "kept"],
-                    dict[str, list[Any | tuple]]
+                    Literal["S_label", "S_star", "sigma", "label_codes", "star_codes", "separated_number",
+                            "kept_number"],
+                    dict[str, Any]
                 ],
-                features: list[str]
+                dataset: 'Dataset'
         ) -> Self:
             """Constructs a Separation object from the pre-computed pickled file
 
             Args:
                 separation: The pre-computed Separation object
-                features(list[str]): The features of the dataset
+                dataset (Dataset): The dataset the separation was computed on
 
             Returns:
                 An instance of Separation from the pre-computed object
             """
-            separation_obj = cls(Dataset(Path(""), None, None))
-
-            separation_obj.S_label = separation["S_label"]
-            separation_obj.S_star = separation["S_star"]
-            separation_obj.sigma = separation["sigma"]
-            separation_obj.separated = separation["separated"]
-            separation_obj.kept = separation["kept"]
-            separation_obj._all_features = features
+            def as_object_set(objects: ObjectSet | list[int]) -> ObjectSet:
+                # NOTE: Files pickled before the introduction of ObjectSet store plain lists of indexes
+                if isinstance(objects, ObjectSet):
+                    return objects
+
+                return ObjectSet.from_indexes(objects, dataset._size)
+
+            separation_obj = cls(Dataset(Path(""), None))
+
+            separation_obj.S_label = {
+                feature: {label: as_object_set(objects) for label, objects in labels.items()}
+                for feature, labels in separation["S_label"].items()
+            }
+            separation_obj.S_star = {
+                feature: as_object_set(objects) for feature, objects in separation["S_star"].items()
+            }
+            separation_obj.sigma = {
+                feature: as_object_set(objects) for feature, objects in separation["sigma"].items()
+            }
+            separation_obj._all_features = dataset.features
+            separation_obj._class_codes = dataset._pairs._class_codes.copy()
+            separation_obj._classes_number = len(dataset._pairs._histogram)
+            separation_obj._size = dataset._size
+
+            if "label_codes" in separation:
+                separation_obj.label_codes = separation["label_codes"]
+                separation_obj.star_codes = separation["star_codes"]
+            else:
+                # NOTE: Older files store the lists of kept and separated pairs instead of the label codes, which are
+                #       rebuilt from S_label
+                separation_obj.label_codes = {}
+                separation_obj.star_codes = {}
+                for feature, labels in separation_obj.S_label.items():
+                    codes = np.zeros(dataset._size, dtype=code_dtype(len(labels)))
+                    for code, (label, objects) in enumerate(labels.items()):
+                        codes[objects.to_array()] = code
+
+                        if objects == separation_obj.S_star[feature]:
+                            separation_obj.star_codes[feature] = code
+
+                    separation_obj.label_codes[feature] = codes
+
+            if "kept_number" in separation:
+                separation_obj.kept_number = separation["kept_number"]
+                separation_obj.separated_number = separation["separated_number"]
+            else:
+                separation_obj.kept_number = {}
+                separation_obj.separated_number = {}
+                for feature in separation_obj.S_label:
+                    separation_obj.kept_number[feature], separation_obj.separated_number[feature] = \
+                        separation_obj._pairs_numbers(feature)
 
             return separation_obj
 
+        def covered_pairs_number(self, features: list[str]) -> int:
+            """Number of pairs kept or separated by at least one of the given features
+
+            A pair is neither kept nor separated by t only if both its objects are in S^*_t, so the pairs covered by
+            the features are the ones not having both the objects in the intersection of their S^*_t.
+
+            Args:
+                features (list[str]): The features covering the pairs
+
+            Returns:
+                int: Number of covered pairs
+            """
+            if len(features) == 0:
+                return 0
+
+            present = self._class_codes != -1
+            in_star = present.copy()
+            for feature in features:
+                in_star &= self.label_codes[feature] == self.star_codes[feature]
+
+            histograms = class_histograms(
+                self._class_codes[present], in_star[present].astype(np.int64), 2, self._classes_number
+            )
+
+            return int(pairs_from_histograms(histograms.sum(axis=0)) - pairs_from_histograms(histograms[1]))
+
         def for_features_subset(self, features: list[str]) -> Self:
             separation_copy = deepcopy(self)
 
@@ -181,38 +398,189 @@ class Dataset:
                 del separation_copy.S_label[feature]
                 del separation_copy.S_star[feature]
                 del separation_copy.sigma[feature]
-                del separation_copy.kept[feature]
-                del separation_copy.separated[feature]
+                del separation_copy.label_codes[feature]
+                del separation_copy.star_codes[feature]
+                del separation_copy.kept_number[feature]
+                del separation_copy.separated_number[feature]
 
             return separation_copy
 
+        def keeps(self, feature: str, pair: tuple[int, int]) -> bool:
+            """Checks whether a pair is kept by a feature, i.e. both its objects are in sigma
+
+            Args:
+                feature (str): The feature
+                pair (tuple[int, int]): The pair to check
+
+            Returns:
+                bool: True if the pair is kept by the feature
+            """
+            if not self._is_pair(pair):
+                return False
+
+            codes, star = self.label_codes[feature], self.star_codes[feature]
+            return codes[pair[0]] != star and codes[pair[1]] != star
+
+        def separates(self, feature: str, pair: tuple[int, int]) -> bool:
+            """Checks whether a pair is separated by a feature, i.e. exactly one of its objects is in sigma
+
+            Args:
+                feature (str): The feature
+                pair (tuple[int, int]): The pair to check
+
+            Returns:
+                bool: True if the pair is separated by the feature
+            """
+            if not self._is_pair(pair):
+                return False
+
+            codes, star = self.label_codes[feature], self.star_codes[feature]
+            return (codes[pair[0]] == star) != (codes[pair[1]] == star)
+
+        def _is_pair(self, pair: tuple[int, int]) -> bool:
+            obj1, obj2 = pair
+            if not (0 <= obj1 < len(self._class_codes) and 0 <= obj2 < len(self._class_codes)):
+                return False
+
+            code1, code2 = self._class_codes[obj1], self._class_codes[obj2]
+            return code1 != -1 and code2 != -1 and code1 != code2
+
+        def _pairs_histograms(self, feature: str) -> np.ndarray:
+            """Class histogram of the objects of each label of the feature"""
+            present = self._class_codes != -1
+            codes = self.label_codes[feature]
+
+            return class_histograms(
+                self._class_codes[present], codes[present].astype(np.int64), int(codes.max(initial=0)) + 1,
+                self._classes_number
+            )
+
+        def _pairs_numbers(self, feature: str) -> tuple[int, int]:
+            """Number of pairs kept and separated by the feature"""
+            histograms = self._pairs_histograms(feature)
+            star = self.star_codes[feature]
+
+            total_pairs = int(pairs_from_histograms(histograms.sum(axis=0)))
+            star_pairs = int(pairs_from_histograms(histograms[star]))
+            kept_pairs = int(pairs_from_histograms(histograms.sum(axis=0) - histograms[star]))
+
+            return kept_pairs, total_pairs - star_pairs - kept_pairs
+
+        def _star_code(self, feature: str) -> int:
+            """Code of the label whose objects contain the most pairs"""
+            return int(np.argmax(pairs_from_histograms(self._pairs_histograms(feature))))
+
         @property
-        def S_star_intersection(self) -> list[int]:
+        def S_star_intersection(self) -> ObjectSet:
             """Returns the intersection on the tests of S^*_t"""
-            if len(self.S_star.values()) == 0 or any(len(value) == 0 for value in self.S_star.values()):
-                return []
+            if len(self.S_star) == 0:
+                return ObjectSet.empty(self._size)
+
+            return reduce(and_, self.S_star.values())
+
+    @dataclass(init=False)
+    class Intersections:
+        """LRU cache of the intersections ∩ S[*][feature], keyed by the set of features
+
+        A missing intersection is built from the longest cached prefix of the given features, caching each extended
+        prefix on the way: the greedy only ever asks for A and A U {t}, and its runs at different budgets share the
+        first tests they choose, so an intersection is extended by a single S[*][feature] most of the times.
+        """
+
+        hits: int
+        misses: int
+        _entries: OrderedDict[frozenset[str], ObjectSet]
+        _lock: Lock
+        _maxsize: int
+
+        def __init__(self, maxsize: int = INTERSECTION_CACHE_SIZE) -> None:
+            self.hits = 0
+            self.misses = 0
+            self._entries = OrderedDict()
+            self._lock = Lock()
+            self._maxsize = maxsize
+
+        def __getstate__(self) -> dict[str, Any]:
+            return {key: value for key, value in self.__dict__.items() if key != "_lock"}
+
+        def __setstate__(self, state: dict[str, Any]) -> None:
+            self.__dict__.update(state)
+            self._lock = Lock()
 
-            return reduce(np.intersect1d, self.S_star.values())  # type: ignore
+        def __len__(self) -> int:
+            return len(self._entries)
+
+        def intersection(self, features: list[str], S_star: Mapping[str, ObjectSet]) -> ObjectSet:
+            """Returns ∩ S[*][feature] for the given (non-empty) features
+
+            Args:
+                features (list[str]): The features, ordered so that their prefixes are likely to be cached
+                S_star (Mapping[str, ObjectSet]): S[*][feature] for each feature
+
+            Returns:
+                ObjectSet: The intersection
+            """
+            key = frozenset(features)
+            with self._lock:
+                if key in self._entries:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+
+                self.misses += 1
+
+                size = len(features) - 1
+                while size > 0 and frozenset(features[:size]) not in self._entries:
+                    size -= 1
+
+                if size == 0:
+                    intersection = S_star[features[0]]
+                    size = 1
+                    self._store(frozenset(features[:size]), intersection)
+                else:
+                    intersection = self._entries[frozenset(features[:size])]
+                    self._entries.move_to_end(frozenset(features[:size]))
+
+                for feature in features[size:]:
+                    intersection = intersection & S_star[feature]
+                    size += 1
+                    self._store(frozenset(features[:size]), intersection)
+
+                return intersection
+
+        def _store(self, key: frozenset[str], intersection: ObjectSet) -> None:
+            self._entries[key] = intersection
+            self._entries.move_to_end(key)
+
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
 
     costs: dict[str, float]
     features: list[str]
-    _classes: dict[int, str]
-    _data: np.ndarray
+    _class_codes: np.ndarray
+    _class_labels: np.ndarray
+    _columns: dict[str, np.ndarray]
+    _file: str
     _header: list[str]
+    _indexes: np.ndarray
+    _labels: dict[str, np.ndarray]
     _pairs: Pairs
     _path: str
-    _probabilities: list[float]
+    _positions: np.ndarray
+    _probabilities: np.ndarray
     _separation: Separation
+    _size: int
 
     def __init__(
             self,
             dataset_path: Path,
-            pairs: Optional[dict[Literal["pairs"], list[list[int]]]] = None,
             separation: Optional[dict[
-                Literal["S_label", "S_star", "sigma", "separated", "kept"],
-                dict[str, list[Any | tuple]]
+                Literal["S_label", "S_star", "sigma", "label_codes", "star_codes", "separated_number",
+                        "kept_number"],
+                dict[str, Any]
             ]] = None
     ) -> None:
+        self._file = str(dataset_path)
         self._path = dataset_path.name
         if dataset_path.name == "":
             return
@@ -225,26 +593,32 @@ class Dataset:
             number_of_rows = len(dataset_df.index)
             dataset_df["Probability"] = [1 / number_of_rows] * number_of_rows
 
-        self._classes = dataset_df["Class"].to_dict()
-        self._probabilities = dataset_df["Probability"].to_list()
+        self._probabilities = dataset_df["Probability"].to_numpy(dtype=np.float64)
 
         # Add "Index" column
-        dataset_df.insert(loc=0, column="Index", value=range(dataset_df.shape[0]))  # type: ignore
+        self._size = dataset_df.shape[0]
+        self._indexes = np.arange(self._size, dtype=np.int64)
+        self._positions = np.arange(self._size, dtype=np.int64)
 
         # Extract dataset's features and "header"
-        self._header = dataset_df.columns.to_list()
+        self._header = ["Index"] + dataset_df.columns.to_list()
         self.features = self._header[1:-2]
 
-        dataset_np = dataset_df.to_numpy(dtype="object")
+        # NOTE: Each column (and the classes) is stored as integer codes, in the smallest type fitting its number of
+        #       labels, together with the labels themselves sorted by code. Labels are converted back to Python
+        #       objects, so that decoding gives the same values pandas would.
+        class_labels, class_codes = np.unique(dataset_df["Class"].to_numpy(), return_inverse=True)
+        self._class_labels = class_labels.astype("object")
+        self._class_codes = class_codes.astype(code_dtype(len(class_labels)))
 
-        if pairs is None:
-            logger.info("No pairs file found")
-            self._pairs = self.Pairs(dataset_np, dataset_path.stem)
-        else:
-            logger.info("Using pairs from Pickle file")
-            self._pairs = self.Pairs.from_precomputed(pairs)  # type: ignore
+        self._columns = {}
+        self._labels = {}
+        for feature in self.features:
+            labels, codes = np.unique(dataset_df[feature].to_numpy(), return_inverse=True)
+            self._labels[feature] = labels.astype("object")
+            self._columns[feature] = codes.astype(code_dtype(len(labels)))
 
-        self._data = dataset_np[:, :-2]
+        self._pairs = self.Pairs(self._indexes, self._class_codes)
 
         self.costs = {}
 
@@ -253,105 +627,120 @@ class Dataset:
         #        Other cost metrics should be considered!
         for idx, column_name in enumerate(self.features):
             # if isinstance(dataset_np[:, idx + 1][0], numbers.Number):
-            #     self.costs[column_name] = self._data[:, idx + 1].var()
+            #     self.costs[column_name] = self.data()[:, idx + 1].var()
             # else:
-            #     self.costs[column_name] = len(np.unique(self._data[:, idx + 1])) / len(self._data[:, idx + 1])
+            #     self.costs[column_name] = len(self._labels[column_name]) / len(self)
             self.costs[column_name] = 1
 
-        del dataset_df, dataset_np
+        del dataset_df
 
         if separation is None:
             logger.info("No separation file found")
             self._separation = self.Separation(self, dataset_path.stem)
         else:
             logger.info("Using separation from Pickle file")
-            self._separation = self.Separation.from_precomputed(
-                separation, self.features)
+            self._separation = self.Separation.from_precomputed(separation, self)
 
     def __getitem__(self, pos) -> np.ndarray:
         """[] operator overload"""
-        return self._data.__getitem__(pos)
+        return self.data().__getitem__(pos)
 
     def __len__(self) -> int:
-        return self._data.__len__()
+        return len(self._indexes)
 
     def __repr__(self) -> str:
-        full_data = np.vstack((np.array(self._header[:-2]), self._data))
+        full_data = np.vstack((np.array(self._header[:-2]), self.data()))
         return full_data.__repr__()
 
     def copy(self) -> Self:
         """Returns a deep copy of the dataset"""
         return deepcopy(self)
 
+    def covered_pairs_number_for(self, features: list[str]) -> int:
+        """Number of pairs kept or separated by at least one of the given features
+
+        NOTE: The pairs are the ones of the dataset the separation was computed on, as for kept and separated.
+
+        Args:
+            features (list[str]): The features covering the pairs
+
+        Returns:
+            int: Number of covered pairs
+        """
+        return self._separation.covered_pairs_number(features)
+
     def data(self, with_classes: bool = False) -> np.ndarray:
         """Removes useless infos from dataset and returns it
 
+        NOTE: The content is decoded from the integer codes on each call, work on the codes whenever possible
+
         Returns:
             ndarray: The content of the dataset.
         """
+        data = np.column_stack(
+            [self._indexes.astype("object")] +
+            [self._labels[feature][codes] for feature, codes in self._columns.items()]
+        )
+
         if with_classes:
-            return np.hstack((self._data, np.array(list(self.classes.values()))[:, np.newaxis]))
+            return np.column_stack((data, self._class_labels[self._class_codes]))
 
-        return self._data
+        return data
 
     def drop_equal_objects_with_different_class(self) -> None:
-        duplicated_rows = []
-        for idx, row in enumerate(self.data(True)):
-            # Estraggo i successori aventi classe diversa da row
-            successors = self.data(True)[idx + 1:]
-            different_class_mask = np.ma.masked_not_equal(self.data(True)[idx + 1:, -1], row[-1])
-            successors = successors[different_class_mask.mask]
-
-            # Ogni riga successiva a row che abbia la stessa struttura viene aggiunta a 'duplicated_rows'
-            for successor in successors:
-                if np.array_equal(row[1:-1], successor[1:-1]):
-                    duplicated_rows.append((row[0], successor[0]))
-
-        # Computes the class frequencies
-        class_counter = Counter(self._classes.values())
-        rows_to_drop = set()
-        for obj1, obj2 in duplicated_rows:
-            # Extracts the classes of the two objects
-            class1_freq = class_counter[self.classes[obj1]]
-            class2_freq = class_counter[self.classes[obj2]]
-
-            # If obj1's class is the most frequent
-            if class1_freq > class2_freq:
-                # obj1 needs to be removed, updating the counter
-                rows_to_drop.add(obj1)
-                class_counter[self.classes[obj1]] -= 1
-            # If obj2's class is the most frequent
-            elif class1_freq < class2_freq:
-                # obj2 needs to be removed, updating the counter
-                rows_to_drop.add(obj2)
-                class_counter[self.classes[obj2]] -= 1
-            else:
-                # Randomly drops one of the two
-                rand = randint(0, 1)
-
-                if rand == 0:
-                    rows_to_drop.add(obj1)
-                    class_counter[self.classes[obj1]] -= 1
-                else:
-                    rows_to_drop.add(obj2)
-                    class_counter[self.classes[obj2]] -= 1
-
-        # Drops the rows in rows_to_drop
-        for row in rows_to_drop:
-            self.drop_row(row)
+        # Groups the rows having the same features, hashing the codes of the features one column at a time
+        groups = np.zeros(len(self), dtype=np.int64)
+        for feature, codes in self._columns.items():
+            groups = pd.factorize(groups * len(self._labels[feature]) + codes)[0]
+
+        # Only the groups of rows having more than one class contain duplicated rows
+        classes_number = len(self._class_labels)
+        group_classes = pd.unique(groups * classes_number + self._class_codes)
+        conflicting = np.bincount(group_classes // classes_number, minlength=groups.max(initial=-1) + 1) > 1
+
+        # Sorts the conflicting rows by group, so that the rows of each group are contiguous and in dataset order
+        positions = np.flatnonzero(conflicting[groups])
+        positions = positions[np.argsort(groups[positions], kind="stable")]
+        rows_classes = self._class_codes[positions]
+        groups_starts = np.flatnonzero(np.diff(groups[positions], prepend=-1)).tolist()
+        groups_ends = groups_starts[1:] + [len(positions)]
+
+        # NOTE: Every pair of equal rows having different classes loses its row of the most frequent class, so only the
+        #       rows of the least frequent class of a group are kept. The groups are resolved in the order of their
+        #       first row, as factorize numbers them, updating the class frequencies after each one.
+        class_counter = np.bincount(self._class_codes, minlength=classes_number)
+        mask = np.ones(len(self), dtype=bool)
+        for start, end in zip(groups_starts, groups_ends):
+            group_counter = np.bincount(rows_classes[start:end], minlength=classes_number)
+            present_classes = np.flatnonzero(group_counter)
+
+            # Randomly keeps one of the least frequent classes
+            least_frequent = present_classes[class_counter[present_classes] == class_counter[present_classes].min()]
+            kept_class = least_frequent[randint(0, len(least_frequent) - 1)]
+
+            mask[positions[start:end][rows_classes[start:end] != kept_class]] = False
+            group_counter[kept_class] = 0
+            class_counter -= group_counter
+
+        # Drops the rows of the other classes
+        logger.debug("Dropping %i rows", np.count_nonzero(~mask))
+        self.select_rows(mask)
 
     def drop_feature(self, feature: str) -> None:
         if len(self.features) == 1 and self.features[0] == feature:
-            self._data = np.array([])
+            self._columns = {}
             self._header = []
-            # self._classes = {}
-            self._probabilities = []
-            self._pairs.pairs_list = []
+            self._indexes = np.array([], dtype=np.int64)
+            self._positions = np.full(self._size, -1, dtype=np.int64)
+            self._probabilities = np.array([], dtype=np.float64)
+            self._pairs = self.Pairs([], [])
+            self.__dict__.pop("classes", None)
+            self.__dict__.pop("intersections", None)
+            self.__dict__.pop("objects", None)
             return
 
-        feature_index = self.features.index(feature)
-
-        self._data = np.delete(self._data, feature_index + 1, 1)
+        del self._columns[feature]
+        del self._labels[feature]
         self.features.remove(feature)
         self._header.remove(feature)
         del self.costs[feature]
@@ -360,10 +749,15 @@ class Dataset:
         del self.sigma[feature]
 
     def drop_indexes(self, indexes: list[int]) -> None:
-        dataset_indexes = [self._data[index, 0] for index in indexes]
+        """Removes the rows at the given positions
 
-        for index in dataset_indexes:
-            self.drop_row(index)
+        Args:
+            indexes (list[int]): Positions of the rows to remove
+        """
+        mask = np.ones(len(self), dtype=bool)
+        mask[indexes] = False
+
+        self.select_rows(mask)
 
     def drop_row(self, index: int) -> None:
         """Removes the row at given index
@@ -372,28 +766,24 @@ class Dataset:
             index (int): Index of the row to remove
         """
         logger.debug("Dropping row %i", index)
-        drop_index = np.where(self.indexes == index)
-        self._data = np.delete(self._data, drop_index[0][0], axis=0)
-        self._pairs.pairs_list = [pair for pair in self._pairs.pairs_list if index not in pair]
-        del self._probabilities[drop_index[0][0]]
-        del self._classes[index]
+        self.drop_rows([index])
 
-        for feature in self.features:
-            for label in self.S_label[feature]:
-                try:
-                    self.S_label[feature][label].remove(index)
-                except ValueError:
-                    pass
+    def drop_rows(self, indexes: Iterable[int]) -> None:
+        """Removes the rows at the given indexes in a single pass
+
+        Args:
+            indexes (Iterable[int]): Indexes of the rows to remove
+        """
+        indexes = np.unique(np.fromiter(indexes, dtype=np.int64))
+        logger.debug("Dropping %i rows", len(indexes))
 
-            try:
-                self.S_star[feature].remove(index)
-            except ValueError:
-                pass
+        if len(indexes) > 0 and (indexes[0] < 0 or indexes[-1] >= self._size or np.any(self._positions[indexes] == -1)):
+            raise IndexError("Cannot drop rows not in the dataset")
 
-            try:
-                self.sigma[feature].remove(index)
-            except ValueError:
-                pass
+        mask = np.ones(len(self), dtype=bool)
+        mask[self._positions[indexes]] = False
+
+        self.select_rows(mask)
 
     def difference(self, other: list[int], *, axis=0) -> np.ndarray:
         """Computes the set difference between two datasets
@@ -406,55 +796,70 @@ class Dataset:
             ndarray: the set difference between two datasets
         """
         logger.debug("Computing datasets difference")
-        drop_indexes = np.array(list(chain(np.where(self.indexes == index) for index in other))).flatten()
+        drop_indexes = self._rows_of(np.asarray(other, dtype=np.int64))
+
+        return np.delete(self.data(), drop_indexes[drop_indexes != -1], axis)
 
-        return np.delete(self.data(), drop_indexes, axis)
+    def _rows_of(self, indexes: np.ndarray) -> np.ndarray:
+        """Positions of the given objects among the rows, -1 for the objects not in the dataset"""
+        return self._positions[indexes]
 
-    def intersection(self, other: list[int]) -> Self:
+    def intersection(self, other: ObjectSet | list[int]) -> 'DatasetView':
         """Calculates the intersection between the dataset and the given subset of rows
 
+        NOTE: The intersection is a view on the dataset, no data is copied.
+
         Args:
-            other (list[int]): Indexes of the rows to intersect
+            other (ObjectSet | list[int]): Indexes of the rows to intersect
 
         Returns:
-            Dataset: The resulting intersection
+            DatasetView: The resulting intersection
         """
-        dataset_copy = self.copy()
-        difference = set(self.indexes) - set(other)
+        if not isinstance(other, ObjectSet):
+            other = ObjectSet.from_indexes(other, self._size)
 
-        for row in difference:
-            dataset_copy.drop_row(row)
+        return DatasetView(self, self.objects & other)
 
-        return dataset_copy
+    def k_fold_split(self, k: int) -> list[dict[str, 'DatasetView']]:
+        """Splits the dataset in k train/test folds
+
+        NOTE: The folds are views on the dataset, so their pairs and separation are derived from the ones of the
+              dataset instead of being recomputed or copied.
+
+        Args:
+            k (int): Number of folds
 
-    def k_fold_split(self, k: int) -> list[dict[str, Self]]:
+        Returns:
+            list[dict[str, DatasetView]]: The train and test datasets of each fold
+        """
         k_fold = KFold(k, shuffle=True)
 
-        folds = k_fold.split(self._data)
+        folds = k_fold.split(self._indexes)
 
         k_folded_datasets = []
         for train, test in folds:
-            train_dataset = self.copy()
-            test_dataset = self.copy()
-
-            train_dataset.drop_indexes(test.tolist())
-            test_dataset.drop_indexes(train.tolist())
+            train_dataset = self.intersection(self._indexes[train])
+            test_dataset = self.intersection(self._indexes[test])
 
             k_folded_datasets.append({"train": train_dataset, "test": test_dataset})
 
         return k_folded_datasets
 
+    def keeps(self, feature: str, pair: tuple[int, int]) -> bool:
+        """Checks whether the given feature keeps the pair, i.e. both its objects are in sigma"""
+        return self._separation.keeps(feature, pair)
+
     def labels_for(self, feature: str) -> np.ndarray:
-        if not np.any(self._data):
+        if len(self) == 0:
             return np.array([])
 
-        return np.unique(self._data[:, self.features.index(feature) + 1])
+        return self._labels[feature][np.unique(self._columns[feature])]
 
-    def pairs_number_for(self, objects: list[int]) -> int:
+    def pairs_number_for(self, objects: ObjectSet | list[int]) -> int:
         """Number of pairs containing objects
 
         Args:
-            objects (list[int]): The objects to be checked
+            objects (ObjectSet | list[int]): The objects to be checked
 
         Returns:
             int: Number of pairs
@@ -462,54 +867,156 @@ class Dataset:
         if len(objects) <= 1:
             return 0
 
-        return len({
-            pair
-            for obj in objects
-            for pair in self.pairs_list
-            if obj in pair and pair[0] in objects and pair[1] in objects
-        })
+        return self._pairs.number_for(objects)
+
+    def pairs_number_for_many(self, subsets: list[ObjectSet | list[int]]) -> np.ndarray:
+        """Number of pairs containing objects, for many subsets of objects at once
+
+        Args:
+            subsets (list[ObjectSet | list[int]]): The objects to be checked, for each subset
+
+        Returns:
+            np.ndarray: Number of pairs for each subset
+        """
+        return self._pairs.number_for_many(subsets)
+
+    def save_separation(self, path: Path) -> None:
+        """Pickles the separation of the dataset, to be passed back to the constructor
+
+        Args:
+            path (Path): The path of the pickled separation
+        """
+        self._separation.save(path)
 
     def S_label_union_for(self, feature) -> list[int]:
-        return reduce(lambda x, y: x + y, self.S_label[feature].values())
+        return list(chain.from_iterable(objects.tolist() for objects in self.S_label[feature].values()))
 
-    def S_star_intersection_for_features(self, features: list[str]) -> list[int]:
+    def S_star_intersection_for_features(self, features: list[str]) -> ObjectSet:
         if len(features) == 0:
             # NOTE: 04/05/2023 - According to what the paper says, we use S[*][feature] to represent the set of objects
             #       not covered by all the already extracted tests.
             #       So, avoiding the usual set intersection rule, while computing ∩ S[*][feature] among all features
             #       in a given set, if the given set is empty we should return the whole set of objects in the dataset.
             #       This holds, since all objects in our dataset are not covered by the tests in an empty set.
-            return self.indexes.tolist()  # type: ignore
+            return self.objects
+
+        return self.intersections.intersection(features, self.S_star)
+
+    def S_star_statistics(
+            self,
+            features: list[str],
+            objects: Optional[ObjectSet] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Class histograms and probabilities of S[*][feature] ∩ objects, for all the features at once
+
+        NOTE: The probabilities are summed by a matrix product, so they are exact only up to rounding errors
 
-        S_stars = [self.S_star[feature] for feature in features]
-        return list(set(S_stars[0]).intersection(*S_stars[1:]))
+        Args:
+            features (list[str]): The features
+            objects (Optional[ObjectSet]): The objects S[*][feature] is restricted to. Defaults to all the objects.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The (features x classes) matrix of class counts and the probabilities
+        """
+        rows = np.arange(len(self)) if objects is None else self._rows_of(objects.to_array())
+        rows = rows[rows != -1]
+        indexes = self._indexes[rows]
+        classes_number = len(self._class_labels)
+
+        # Each row is described by its one-hot encoded class, followed by its probability
+        weights = np.zeros((len(rows), classes_number + 1))
+        weights[np.arange(len(rows)), self._class_codes[rows]] = 1
+        weights[:, -1] = self._probabilities[rows]
+
+        label_codes, star_codes = self._separation.label_codes, self._separation.star_codes
+        statistics = np.zeros((len(features), classes_number + 1))
+
+        block_size = max(1, STATISTICS_BLOCK_SIZE // max(len(rows), 1))
+        for start in range(0, len(features), block_size):
+            block = features[start:start + block_size]
+            in_star = np.stack([label_codes[feature][indexes] == star_codes[feature] for feature in block])
+            statistics[start:start + len(block)] = in_star.astype(np.float64) @ weights
+
+        return statistics[:, :-1].round().astype(np.int64), statistics[:, -1]
+
+    def select_rows(self, mask: np.ndarray) -> None:
+        """Keeps only the selected rows, updating data, classes, probabilities, pairs and separation in a single pass
+
+        Args:
+            mask (np.ndarray): Boolean mask over the rows, True for the rows to keep
+        """
+        dropped_indexes = self._indexes[~mask]
+
+        self._indexes = self._indexes[mask]
+        self._columns = {feature: codes[mask] for feature, codes in self._columns.items()}
+        self._class_codes = self._class_codes[mask]
+        self._probabilities = self._probabilities[mask]
+
+        self._positions = np.full(self._size, -1, dtype=np.int64)
+        self._positions[self._indexes] = np.arange(len(self._indexes))
+
+        self._pairs.drop_many(dropped_indexes)
+        self.__dict__.pop("classes", None)
+        self.__dict__.pop("intersections", None)
+        self.__dict__.pop("objects", None)
+
+        dropped = ObjectSet.from_indexes(dropped_indexes, self._size)
+        for feature in self.features:
+            for label in self.S_label[feature]:
+                self.S_label[feature][label] -= dropped
+
+            self.S_star[feature] -= dropped
+            self.sigma[feature] -= dropped
+
+    def separates(self, feature: str, pair: tuple[int, int]) -> bool:
+        """Checks whether the given feature separates the pair, i.e. exactly one of its objects is in sigma"""
+        return self._separation.separates(feature, pair)
 
     def without_feature(self, feature: str) -> Self:
         dataset_copy = self.copy()
         dataset_copy.drop_feature(feature)
         return dataset_copy
 
-    @property
+    @cached_property
     def classes(self) -> dict[int, str]:
         """Returns a dict of all the possible classes with relative object index"""
-        return self._classes
+        return dict(zip(self._indexes.tolist(), self._class_labels[self._class_codes].tolist()))
 
     @property
     def indexes(self) -> np.ndarray:
-        return self._data[:, 0].flatten()  # type: ignore
+        return self._indexes
+
+    @cached_property
+    def intersections(self) -> Intersections:
+        """Returns the cache of the intersections ∩ S[*][feature], with its hit and miss counters"""
+        return self.Intersections()
 
     @property
     def is_empty(self) -> bool:
-        return not np.any(self._data[:, 1:-2])
+        return not np.any(self.data()[:, 1:-2])
+
+    @property
+    def kept_number(self) -> dict[str, int]:
+        """Returns the number of pairs kept by each feature"""
+        return self._separation.kept_number
 
     @cached_property
-    def kept(self) -> dict[str, list[tuple[int]]]:
-        return self._separation.kept
+    def objects(self) -> ObjectSet:
+        """Returns the objects of the dataset as an ObjectSet"""
+        return ObjectSet.from_indexes(self.indexes, self._size)
+
+    @property
+    def pairs(self) -> Pairs:
+        """Returns the (implicit) pairs of the dataset"""
+        return self._pairs
 
     @property
     def pairs_list(self) -> list[tuple]:
-        """Returns a list of all the pairs of the dataset"""
-        return self._pairs.pairs_list
+        """Returns a list of all the pairs of the dataset
+
+        NOTE: The list is materialized on each access, iterate over `pairs` whenever possible
+        """
+        return list(self._pairs)
 
     @property
     def pairs_number(self) -> int:
@@ -517,19 +1024,20 @@ class Dataset:
         return self._pairs.number
 
     @cached_property
-    def S_label(self) -> dict[str, dict[Any, list[int]]]:
+    def S_label(self) -> dict[str, dict[Any, ObjectSet]]:
         return self._separation.S_label
 
     @cached_property
-    def S_star(self) -> dict[str, list[int]]:
+    def S_star(self) -> dict[str, ObjectSet]:
         return self._separation.S_star
 
-    @cached_property
-    def separated(self) -> dict[str, list[tuple[int]]]:
-        return self._separation.separated
+    @property
+    def separated_number(self) -> dict[str, int]:
+        """Returns the number of pairs separated by each feature"""
+        return self._separation.separated_number
 
     @cached_property
-    def sigma(self) -> dict[str, list[int]]:
+    def sigma(self) -> dict[str, ObjectSet]:
         return self._separation.sigma
 
     @property
@@ -548,4 +1056,123 @@ class Dataset:
         Returns:
             float: Sum of all the probabilities
         """
-        return fsum(self._probabilities)
+        return fsum(self._probabilities.tolist())
+
+
+class DatasetView(Dataset):
+    """A read-only view on a subset of the objects of a Dataset
+
+    The view only stores its parent dataset and the objects it contains: data, classes, probabilities, pairs and
+    separation are derived lazily from the ones of the parent, masking out the objects that are not in the view.
+    """
+
+    _objects: ObjectSet
+    _parent: Dataset
+
+    def __init__(self, parent: Dataset, objects: ObjectSet) -> None:
+        self._objects = objects
+        self._parent = parent
+
+        self._class_labels = parent._class_labels
+        self._file = parent._file
+        self._header = parent._header
+        self._labels = parent._labels
+        self._path = parent._path
+        self._separation = parent._separation
+        self._size = parent._size
+        self.costs = parent.costs
+        self.features = parent.features
+
+    def __getstate__(self) -> dict[str, Any]:
+        # NOTE: Only the file of the parent and the objects are pickled, so that a view does not carry its whole
+        #       parent along. The parent is read back from its file, with its saved separation if any, and everything
+        #       else is derived again on first access.
+        return {"_file": self._file, "_objects": self._objects}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        path = Path(state["_file"])
+        DatasetView.__init__(self, Dataset(path, Dataset.Separation.saved(path.stem)), state["_objects"])
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def copy(self) -> Self:
+        """Returns a view on the same objects"""
+        return DatasetView(self._parent, self._objects)
+
+    def drop_feature(self, feature: str) -> None:
+        raise TypeError("Cannot drop a feature from a DatasetView")
+
+    def drop_row(self, index: int) -> None:
+        raise TypeError("Cannot drop a row from a DatasetView")
+
+    def drop_rows(self, indexes: Iterable[int]) -> None:
+        raise TypeError("Cannot drop rows from a DatasetView")
+
+    def select_rows(self, mask: np.ndarray) -> None:
+        raise TypeError("Cannot select rows of a DatasetView")
+
+    def intersection(self, other: ObjectSet | list[int]) -> Self:
+        """Calculates the intersection between the view and the given subset of rows
+
+        Args:
+            other (ObjectSet | list[int]): Indexes of the rows to intersect
+
+        Returns:
+            DatasetView: The resulting intersection, as a view on the same parent
+        """
+        if not isinstance(other, ObjectSet):
+            other = ObjectSet.from_indexes(other, self._size)
+
+        return DatasetView(self._parent, self._objects & other)
+
+    @cached_property
+    def _class_codes(self) -> np.ndarray:
+        return self._parent._class_codes[self._parent_positions]
+
+    @cached_property
+    def _columns(self) -> dict[str, np.ndarray]:
+        return {feature: codes[self._parent_positions] for feature, codes in self._parent._columns.items()}
+
+    @cached_property
+    def _indexes(self) -> np.ndarray:
+        return self._objects.to_array()
+
+    @cached_property
+    def _pairs(self) -> Dataset.Pairs:
+        return self._parent._pairs.restricted_to(self._objects)
+
+    @cached_property
+    def _parent_positions(self) -> np.ndarray:
+        """Positions of the objects of the view among the rows of the parent"""
+        return self._parent._positions[self._indexes]
+
+    def _rows_of(self, indexes: np.ndarray) -> np.ndarray:
+        # NOTE: The indexes of the view are sorted, so they are searched instead of being mapped through an array over
+        #       the whole dataset
+        rows = np.searchsorted(self._indexes, indexes)
+        present = rows < len(self._indexes)
+        present[present] = self._indexes[rows[present]] == indexes[present]
+
+        return np.where(present, rows, -1)
+
+    @cached_property
+    def _probabilities(self) -> np.ndarray:
+        return self._parent._probabilities[self._parent_positions]
+
+    @property
+    def objects(self) -> ObjectSet:
+        """Returns the objects of the view as an ObjectSet"""
+        return self._objects
+
+    @cached_property
+    def S_label(self) -> MaskedObjectSets:
+        return MaskedObjectSets(self._parent.S_label, self._objects)
+
+    @cached_property
+    def S_star(self) -> MaskedObjectSets:
+        return MaskedObjectSets(self._parent.S_star, self._objects)
+
+    @cached_property
+    def sigma(self) -> MaskedObjectSets:
+        return MaskedObjectSets(self._parent.sigma, self._objects)
@@ -1,8 +1,15 @@
 import logging
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from copy import copy
+from dataclasses import replace
+from math import fsum
+from multiprocessing import get_all_start_methods, get_context
 from os.path import dirname
 from pathlib import Path
 from pickle import HIGHEST_PROTOCOL, Unpickler, dump
 from pprint import pformat
+from time import monotonic
 from typing import Optional, Self
 from uuid import UUID
 
@@ -10,11 +17,14 @@ import numpy as np
 
 import src
 from src.budget import find_budget
-from src.dataset import Dataset
+from src.checkpoint import CHECKPOINT_INTERVAL, BuildCheckpoint
+from src.dataset import Dataset, DatasetView
 from src.extraction import cheapest_separation, eligible_labels
 from src.maximization import pairs_maximization, probability_maximization
+from src.object_set import ObjectSet
+from src.scheduling import SCHEDULING_POLICIES, SUBPROBLEM_CACHE_SIZE, BuildContext, BuildTask, SubproblemCache
 from src.tree import Tree
-from src.utils import get_backbone_label, prune
+from src.utils import budget_executor, get_backbone_label, label_test_leaves, majority_class, prune
 
 logger = logging.getLogger("decision_tree")
 
@@ -22,18 +32,109 @@ logger = logging.getLogger("decision_tree")
 class DecisionTree:
     dataset: Optional[Dataset] = None
     decision_tree: Optional[Tree] = None
+    epsilon: Optional[float] = None
+    seed: Optional[int] = None
+    workers: int = 1
+    _budget_executor: Optional[ProcessPoolExecutor] = None
+
+    # NOTE: The budget search of a subproblem can be skipped below these thresholds, reusing the budget of its parent,
+    #       or bounded above by the budget of its parent. Both change the resulting trees, so they are off by default.
+    min_search_cost: float = 0.0
+    min_search_pairs: int = 0
+    propagate_budget: bool = False
+    skipped_searches: int = 0
+
+    # NOTE: With more than one build worker, the subproblems with at least min_dispatch_pairs pairs are built in a
+    #       pool of processes, idle workers taking the next pending subproblem
+    build_workers: int = 1
+    min_dispatch_pairs: int = 0
+    _executor: Optional[ProcessPoolExecutor] = None
+
+    # NOTE: The order in which the pending subproblems are built, one of SCHEDULING_POLICIES, and the maximum number of
+    #       subproblems dispatched to the build workers at the same time, bounding the memory they take
+    scheduling: str = "depth-first"
+    max_in_flight: Optional[int] = None
+
+    subproblem_cache_size: int = SUBPROBLEM_CACHE_SIZE
+
+    # NOTE: Pruning removes the nodes deeper than max_depth anyway, so with depth_aware the nodes reaching it are
+    #       closed as majority-class leaves instead of being expanded. The pruned tree is the same.
+    depth_aware: bool = False
+    max_depth: int = src.MAX_DEPTH
+
+    # NOTE: Limits of an anytime build, in seconds, nodes and bytes of peak memory: once one is reached the pending
+    #       subproblems are closed as majority-class leaves. The limit reached, if any, and the number of objects in
+    #       the leaves closed before being expanded are reported after the fit.
+    time_limit: Optional[float] = None
+    max_nodes: Optional[int] = None
+    max_memory: Optional[int] = None
+    limit: Optional[str] = None
+    truncated_objects: int = 0
+
+    # NOTE: The subtrees built by fit are logged here, so that an interrupted fit can be resumed
+    _checkpoint: Optional[BuildCheckpoint] = None
+
+    @staticmethod
+    def _max_depth_reached(context: BuildContext, depth: int) -> bool:
+        return context.max_depth is not None and depth >= context.max_depth
+
+    @staticmethod
+    def _close_node(tree: Tree, dataset: Dataset, node: UUID, marker: str = "truncated") -> None:
+        """Turns a node into a leaf labelled with the majority class of its objects, marking why it was closed
+
+        NOTE: The nodes closed by a limit of the build are marked as "truncated", the ones closed at the maximum depth
+              as "depth_closed", so that only the former are reported as truncated.
+        """
+        tree.structure.nodes[node]["label"] = majority_class(dataset, tree.structure.nodes[node]["objects"])
+        tree.structure.nodes[node][marker] = True
 
-    def _build_decision_tree(self, dataset: Dataset, tests: list[str], costs: dict[str, float]) -> tuple[Tree, bool]:
-        """Recursively builds a (log)-optimal decision tree.
+    @classmethod
+    def _closed_leaf(cls, dataset: Dataset, objects: list[int], pairs_number: int, marker: str = "truncated") -> Tree:
+        """The subtree of a subproblem left unbuilt, a single leaf closed as by _close_node"""
+        subtree = Tree()
+        leaf = subtree.add_node(objects, pairs_number, "")
+        cls._close_node(subtree, dataset, leaf, marker)
+
+        return subtree
+
+    @staticmethod
+    def _backbone_limit_reached(
+            context: BuildContext,
+            nodes: int,
+            tree: Tree,
+            tasks: list[BuildTask],
+            labels_number: int
+    ) -> bool:
+        """Whether a limit of the build is reached before adding a test to a backbone, counting the nodes of the tree
+        with the test, and a leaf for each of its subproblems and for the objects left out of the backbone"""
+        return context.limit_reached(nodes + tree.structure.number_of_nodes() + 1 + len(tasks) + labels_number + 1)
+
+    def _build_node(
+            self,
+            context: BuildContext,
+            dataset: Dataset,
+            tests: list[str],
+            parent_budget: Optional[float] = None,
+            depth: int = 0,
+            nodes: int = 0
+    ) -> tuple[Tree, bool, list[BuildTask]]:
+        """Builds the backbone of a (log)-optimal decision tree, leaving out the subtrees of its subproblems.
 
         Args:
+            context (BuildContext): The costs of the tests, the depth limit and the caches of the construction
             dataset (Dataset): The dataset used to train the model
             tests (list[str]): The features from which the tree will be built
-            costs (doct[str, float]): The costs for the tests
+            parent_budget (Optional[float], optional): The budget of the parent subproblem, if any. Defaults to None.
+            depth (int, optional): The depth of the root of the backbone in the whole tree. Defaults to 0.
+            nodes (int, optional): The nodes of the rest of the tree, counting a leaf for each of its pending
+                subproblems. Defaults to 0.
 
         Returns:
-            Tree: The (log)-optimal decision tree
+            tuple[Tree, bool, list[BuildTask]]: The backbone, whether it is the base case of a single pair and the
+                subproblems whose subtrees are to be grafted on it
         """
+        costs = context.costs
+
         # BASE CASE: If no pairs, return a leaf labelled by the only class in dataset
         if dataset.pairs_number == 0:
             tree = Tree()
@@ -48,41 +149,63 @@ class DecisionTree:
             else:
                 logger.info("No more objects in dataset")
 
-            return tree, False
+            return tree, False, []
 
         # BASE CASE: If just one pair
         if dataset.pairs_number == 1:
-            logger.info(f"Just one pair in dataset: {dataset.pairs_list[0]}")
+            pair = next(iter(dataset.pairs))
+            logger.info(f"Just one pair in dataset: {pair}")
 
             # Create a tree rooted by the cheapest test that separates the two items
             tree = Tree()
-            split = cheapest_separation(dataset, costs, dataset.pairs_list[0])
+            split = cheapest_separation(dataset, costs, pair)
 
             logger.info("Setting node \"%s\" as root of the subtree", split)
             indexes_covered = dataset.S_label_union_for(split)
             root_id = tree.add_node(indexes_covered, dataset.pairs_number_for(indexes_covered), split)
 
+            if self._max_depth_reached(context, depth):
+                self._close_node(tree, dataset, root_id, "depth_closed")
+                return tree, True, []
+
+            if context.limit_reached(nodes + 3):
+                self._close_node(tree, dataset, root_id)
+                return tree, True, []
+
             # Add the two items as leafs labelled with the respective class
-            class_1 = str(dataset.classes[dataset.pairs_list[0][0]])
+            class_1 = str(dataset.classes[pair[0]])
             label_1 = str(dataset[0, dataset.features.index(split) + 1])
 
-            class_2 = str(dataset.classes[dataset.pairs_list[0][1]])
+            class_2 = str(dataset.classes[pair[1]])
             label_2 = str(dataset[1, dataset.features.index(split) + 1])
 
             logger.info(f"Adding leaf \"{class_1}\" as child of {tree.get_label_of_node(root_id)}")
-            tree.add_node(dataset.S_label[split][label_1], 0, class_1, root_id, label_1)
+            tree.add_node(dataset.S_label[split][label_1].tolist(), 0, class_1, root_id, label_1)
             logger.info(f"Adding leaf \"{class_2}\" as child of {tree.get_label_of_node(root_id)}")
-            tree.add_node(dataset.S_label[split][label_2], 0, class_2, root_id, label_2)
-
-            return tree, True
-
-        budget = find_budget(dataset, tests, src.COSTS)
+            tree.add_node(dataset.S_label[split][label_2].tolist(), 0, class_2, root_id, label_2)
+
+            return tree, True, []
+
+        if self._max_depth_reached(context, depth):
+            logger.info("Maximum depth reached, closing the subproblem with a leaf")
+            return self._closed_leaf(dataset, dataset.indexes.tolist(), dataset.pairs_number, "depth_closed"), False, []
+
+        tests_cost = fsum(costs[test] for test in tests)
+        if dataset.pairs_number < self.min_search_pairs or tests_cost < self.min_search_cost:
+            budget = tests_cost if parent_budget is None else parent_budget
+            self.skipped_searches += 1
+            logger.info("Skipping the budget search of a small subproblem")
+        else:
+            budget = find_budget(
+                dataset, tests, costs, self.epsilon, self.seed, self.workers,
+                parent_budget if self.propagate_budget else None, self._budget_executor, context.limit_reached
+            )
         logger.info("Using budget %f", budget)
 
         spent = 0.0
         spent_2 = 0.0
 
-        universe = dataset.copy()
+        universe = dataset
 
         # Removes from T all tests with cost greater than budget
         budgeted_features = [test for test in tests if costs[test] <= budget]
@@ -91,7 +214,9 @@ class DecisionTree:
         # Inits the structure
         tree = Tree()
         last_added_node: Optional[UUID] = None
+        last_added_depth = depth - 1
         backbone_label = ""
+        tasks: list[BuildTask] = []
 
         # While exists at least a test with cost equal or less than (budget - spent)
         logger.info("Starting t_A construction")
@@ -104,6 +229,11 @@ class DecisionTree:
             )
             logger.debug("Test that maximizes the probability: %s", chosen_test)
 
+            labels = eligible_labels(universe, chosen_test)
+            if self._backbone_limit_reached(context, nodes, tree, tasks, len(labels)):
+                logger.info("Limit of the build reached, ending the backbone")
+                break
+
             if tree.is_empty:
                 # Set chosen_test as the root of the tree
                 logger.info("Setting %s as root of the tree", chosen_test)
@@ -128,24 +258,32 @@ class DecisionTree:
                     backbone_label
                 )
 
+            # NOTE: The descendants of a node at the maximum depth would be pruned, so the backbone ends there
+            last_added_depth += 1
+            if self._max_depth_reached(context, last_added_depth):
+                self._close_node(tree, dataset, last_added_node, "depth_closed")
+                return tree, False, tasks
+
             # For each label in the possible outcomes of chosen_test
-            for label in eligible_labels(universe, chosen_test):
+            for label in labels:
                 logger.info("Expanding test \"%s\" with label %s", chosen_test, label)
                 universe_intersection = universe.intersection(universe.S_label[chosen_test][label])
                 logger.debug(f"U ∩ S[{chosen_test}][{label}]: {pformat(universe_intersection.indexes)}")
 
                 # Set the tree resulting from the recursive call as the child of chosen_test
                 logger.info("Constructing non-backbone (t_A) subtree of \"%s\"", chosen_test)
-                subtree, is_split_base_case = self._build_decision_tree(
+                tasks.append(BuildTask(
                     # NOTE: 27/02/2023 - Remove the chosen feature before the recursive call
                     #       Instead of removing it from the dataset just to add it back after the return an updated copy
                     #       of the dataset is passed as parameter.
-                    universe_intersection,
+                    universe_intersection.objects,
                     [test for test in budgeted_features if test != chosen_test],
-                    src.COSTS
-                )
-
-                tree.add_subtree(last_added_node, subtree, str(label))
+                    universe_intersection.pairs_number,
+                    budget,
+                    last_added_node,
+                    str(label),
+                    last_added_depth + 1
+                ))
 
             # NOTE: 09/05/2023 - Given any node in the tree, this is how it's children are created
             #                                            t_{k - 1}
@@ -177,11 +315,16 @@ class DecisionTree:
 
         # If there are still some tests with cost greater than budget
         logger.info(f"Starting t_B construction")
-        if len(budgeted_features) != 0 and len(universe) != 0:
+        if len(budgeted_features) != 0 and len(universe) != 0 and context.limit is None:
             while True:
                 chosen_test = pairs_maximization(universe, budgeted_features, costs)
                 logger.debug("Test that maximizes the pairs number: %s", chosen_test)
 
+                labels = eligible_labels(universe, chosen_test)
+                if self._backbone_limit_reached(context, nodes, tree, tasks, len(labels)):
+                    logger.info("Limit of the build reached, ending the backbone")
+                    break
+
                 # Set chosen_test as child of the test added in the last iteration
                 logger.info(
                     f"Adding node {chosen_test} as child of {tree.get_label_of_node(last_added_node)} " +
@@ -196,24 +339,32 @@ class DecisionTree:
                     backbone_label
                 )
 
+                # NOTE: The descendants of a node at the maximum depth would be pruned, so the backbone ends there
+                last_added_depth += 1
+                if self._max_depth_reached(context, last_added_depth):
+                    self._close_node(tree, dataset, last_added_node, "depth_closed")
+                    return tree, False, tasks
+
                 # For each label in the possible outcomes of chosen_test
-                for label in eligible_labels(universe, chosen_test):
+                for label in labels:
                     logger.info("Expanding test \"%s\" with label %s", chosen_test, label)
                     universe_intersection = universe.intersection(universe.S_label[chosen_test][label])
                     logger.debug(f"U ∩ S[{chosen_test}][{label}]: {pformat(universe_intersection.indexes)}")
 
                     # Set the tree resulting from the recursive call as the child of chosen_test
                     logger.info("Constructing non-backbone (t_B) subtree of \"%s\"", chosen_test)
-                    subtree, is_split_base_case = self._build_decision_tree(
+                    tasks.append(BuildTask(
                         # NOTE: 27/02/2023 - Remove the chosen feature before the recursive call
                         #       Instead of removing it from the dataset just to add it back after the return an updated
                         #       copy of the dataset is passed as parameter.
-                        universe_intersection,
+                        universe_intersection.objects,
                         [test for test in budgeted_features if test != chosen_test],
-                        src.COSTS
-                    )
-
-                    tree.add_subtree(last_added_node, subtree, str(label))
+                        universe_intersection.pairs_number,
+                        budget,
+                        last_added_node,
+                        str(label),
+                        last_added_depth + 1
+                    ))
 
                 # NOTE: 09/05/2023 - Given any node in the tree, this is how it's children are created
                 #                                            t_{k - 1}
@@ -247,26 +398,350 @@ class DecisionTree:
 
         logger.info("End of t_B construction!")
 
+        # NOTE: A limit reached before the root of the backbone closes the whole subproblem
+        if tree.is_empty:
+            return self._closed_leaf(dataset, dataset.indexes.tolist(), dataset.pairs_number), False, []
+
         if len(universe) != 0:
-            # Set the tree resulting from the recursive call as child of the test added in the last iteration
-            logger.info("Final recursive call with all the objects not in the backbone")
-            subtree, _ = self._build_decision_tree(universe, src.TESTS, src.COSTS)
+            # The objects not in the backbone are a subproblem, child of the test added in the last iteration
+            logger.info("Final subproblem with all the objects not in the backbone")
             backbone_label = get_backbone_label(dataset, tree.get_label_of_node(last_added_node))
-            tree.add_subtree(last_added_node, subtree, backbone_label)
+            tasks.append(BuildTask(
+                universe.objects, context.tests, universe.pairs_number,
+                parent=last_added_node, label=backbone_label, depth=last_added_depth + 1
+            ))
+
+        return tree, False, tasks
+
+    def _build_decision_tree(
+            self,
+            context: BuildContext,
+            dataset: Dataset,
+            tests: list[str],
+            parent_budget: Optional[float] = None,
+            depth: int = 0
+    ) -> tuple[Tree, bool]:
+        """Builds a (log)-optimal decision tree.
+
+        NOTE: Instead of recursing on the subproblems, the backbone of each of them is built in turn, driven by a queue
+              of pending subproblems whose order is given by the scheduling policy, and grafted on its parent node.
+
+        Args:
+            context (BuildContext): The costs of the tests, the depth limit and the caches of the construction
+            dataset (Dataset): The dataset used to train the model
+            tests (list[str]): The features from which the tree will be built
+            parent_budget (Optional[float], optional): The budget of the parent subproblem, if any. Defaults to None.
+            depth (int, optional): The depth of the root of the tree in the whole tree. Defaults to 0.
+
+        Returns:
+            Tree: The (log)-optimal decision tree
+        """
+        tree, is_split_base_case, tasks = self._build_node(context, dataset, tests, parent_budget, depth)
+        if self._checkpoint is not None and context.limit is None:
+            self._checkpoint.record(None, tree, tasks)
 
-        return tree, False
+        return self._build_subproblems(context, dataset, tree, tasks), is_split_base_case
+
+    def _build_subproblems(
+            self,
+            context: BuildContext,
+            dataset: Dataset,
+            tree: Tree,
+            tasks: list[BuildTask]
+    ) -> Tree:
+        """Builds the subtrees of the pending subproblems, grafting them on the tree
+
+        Args:
+            context (BuildContext): The costs of the tests, the depth limit and the caches of the construction
+            dataset (Dataset): The dataset used to train the model
+            tree (Tree): The tree built so far
+            tasks (list[BuildTask]): The pending subproblems
+
+        Returns:
+            Tree: The whole tree
+        """
+        queue = SCHEDULING_POLICIES[self.scheduling]()
+        for task in tasks:
+            queue.push(task)
+
+        dispatched: deque[tuple[BuildTask, Future]] = deque()
+        while len(queue) > 0 or len(dispatched) > 0:
+            if len(queue) == 0 or (
+                    self.max_in_flight is not None and len(dispatched) >= self.max_in_flight
+            ):
+                task, future = dispatched.popleft()
+                subtree, skipped_searches, limit = future.result()
+                self.skipped_searches += skipped_searches
+
+                # NOTE: The subproblems built at the same time are all given the nodes left when they were dispatched,
+                #       so the subtrees no longer fitting in the node budget are closed as leaves instead
+                if context.max_nodes is not None and (
+                        tree.structure.number_of_nodes() + subtree.structure.number_of_nodes() + len(queue)
+                        + len(dispatched) > context.max_nodes
+                ):
+                    subtree, limit = self._closed_leaf(dataset, task.objects.tolist(), task.pairs_number), "nodes"
+
+                if context.limit is None:
+                    context.limit = limit
+
+                tree.add_subtree(task.parent, subtree, task.label)
+                # NOTE: The subtrees closed by a limit are left out of the checkpoint, to be built when resuming
+                if self._checkpoint is not None and limit is None:
+                    self._checkpoint.record(task, subtree, [])
+                continue
+
+            task = queue.pop()
+
+            # NOTE: The pending subproblems are counted as the leaves they are closed as, once a limit is reached
+            nodes = tree.structure.number_of_nodes() + len(queue) + len(dispatched)
+            if task.pairs_number > 0 and context.limit_reached(nodes + 1):
+                subtree = self._closed_leaf(dataset, task.objects.tolist(), task.pairs_number)
+                tree.add_subtree(task.parent, subtree, task.label)
+                continue
+
+            if self._executor is not None and task.pairs_number >= self.min_dispatch_pairs:
+                # The worker may build the nodes left within the node budget
+                max_nodes = None if context.max_nodes is None else context.max_nodes - nodes
+                dispatched.append((
+                    task, self._executor.submit(
+                        _build_subtree_worker, task.objects, task.tests, task.parent_budget, task.depth, max_nodes
+                    )
+                ))
+                continue
+
+            subtree, subtasks = self._build_task(context, dataset, task, nodes)
+            tree.add_subtree(task.parent, subtree, task.label)
+            # NOTE: Once a limit is reached the checkpoint stops, so that the backbones it ended are built again when
+            #       resuming
+            if self._checkpoint is not None and context.limit is None:
+                self._checkpoint.record(task, subtree, subtasks)
+
+            for subtask in subtasks:
+                queue.push(subtask)
+
+        return tree
+
+    def _build_task(
+            self,
+            context: BuildContext,
+            dataset: Dataset,
+            task: BuildTask,
+            nodes: int = 0
+    ) -> tuple[Tree, list[BuildTask]]:
+        """Builds the backbone of a subproblem, or shares the one already built for the same subproblem
+
+        Args:
+            context (BuildContext): The costs of the tests, the depth limit and the caches of the construction
+            dataset (Dataset): The dataset the objects of the subproblem are taken from
+            task (BuildTask): The subproblem
+            nodes (int, optional): The nodes of the rest of the tree, counting a leaf for each of its pending
+                subproblems. Defaults to 0.
+
+        Returns:
+            tuple[Tree, list[BuildTask]]: The backbone and the subproblems whose subtrees are to be grafted on it
+        """
+        # NOTE: The tests are always in the order of context.tests, so the sorted tests identify them. The budget of the
+        #       parent only matters when the budget search uses it, and the depth when the tree is built depth-aware.
+        #       The objects of a subproblem do not depend on the dataset it comes from, as long as they share the whole
+        #       dataset, so the folds of a dataset share the cache. Fits with other budget search settings do not.
+        uses_parent_budget = self.propagate_budget or self.min_search_cost > 0 or self.min_search_pairs > 0
+        key = (
+            dataset._path,
+            task.objects.to_bytes(),
+            tuple(sorted(task.tests)),
+            context.costs_key,
+            (self.epsilon, self.seed, self.workers, self.min_search_cost, self.min_search_pairs, self.propagate_budget),
+            task.parent_budget if uses_parent_budget else None,
+            task.depth if context.max_depth is not None else None
+        )
+
+        cached = context.subproblems.get(key)
+        if cached is None:
+            subtree, _, subtasks = self._build_node(
+                context, dataset.intersection(task.objects), task.tests, task.parent_budget, task.depth, nodes
+            )
+            # NOTE: A backbone ended by a limit is not the one of the subproblem, so it is not shared
+            if context.limit is None:
+                context.subproblems.put(key, (subtree, subtasks))
+
+            return subtree, subtasks
+
+        # The shared backbone gets new node identifiers, so that it can be grafted more than once
+        subtree, subtasks = cached
+        if context.limit_reached(nodes + subtree.structure.number_of_nodes() + len(subtasks)):
+            return self._closed_leaf(dataset, task.objects.tolist(), task.pairs_number), []
+
+        shared_subtree, mapping = subtree.relabelled()
+        logger.debug("Sharing the backbone of an already built subproblem")
+
+        return shared_subtree, [replace(subtask, parent=mapping[subtask.parent]) for subtask in subtasks]
+
+    def fit(
+            self,
+            dataset: Dataset,
+            tests: list[str],
+            costs: dict[str, float],
+            dataset_name: str,
+            num: int,
+            epsilon: Optional[float] = None,
+            seed: Optional[int] = None,
+            workers: int = 1,
+            min_search_cost: float = 0.0,
+            min_search_pairs: int = 0,
+            propagate_budget: bool = False,
+            build_workers: int = 1,
+            min_dispatch_pairs: int = 0,
+            scheduling: str = "depth-first",
+            max_in_flight: Optional[int] = None,
+            subproblem_cache_size: int = SUBPROBLEM_CACHE_SIZE,
+            subproblems: Optional[SubproblemCache] = None,
+            depth_aware: bool = False,
+            max_depth: int = src.MAX_DEPTH,
+            time_limit: Optional[float] = None,
+            max_nodes: Optional[int] = None,
+            max_memory: Optional[int] = None,
+            checkpoint_path: Optional[str] = None,
+            checkpoint_interval: float = CHECKPOINT_INTERVAL,
+            resume_from: Optional[str] = None
+    ) -> None:
+        if scheduling not in SCHEDULING_POLICIES:
+            raise ValueError(f"scheduling must be one of {', '.join(SCHEDULING_POLICIES)}, got {scheduling}")
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+        if workers > 1 and epsilon is None:
+            logger.warning("The budgets of the exhaustive greedy share its greedy, so they are probed in this process")
 
-    def fit(self, dataset: Dataset, tests: list[str], costs: dict[str, float], dataset_name: str, num: int) -> None:
         self.dataset = dataset
-        decision_tree, _ = self._build_decision_tree(dataset, tests, costs)
+        self.epsilon = epsilon
+        self.seed = seed
+        self.workers = workers
+        self.min_search_cost = min_search_cost
+        self.min_search_pairs = min_search_pairs
+        self.propagate_budget = propagate_budget
+        self.skipped_searches = 0
+        self.build_workers = build_workers
+        self.min_dispatch_pairs = min_dispatch_pairs
+        self.scheduling = scheduling
+        self.max_in_flight = max_in_flight
+        self.subproblem_cache_size = subproblem_cache_size
+        self.depth_aware = depth_aware
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.max_memory = max_memory
+
+        context = BuildContext(
+            tests,
+            costs,
+            max_depth if depth_aware else None,
+            SubproblemCache(subproblem_cache_size) if subproblems is None else subproblems,
+            None if time_limit is None else monotonic() + time_limit,
+            max_nodes,
+            max_memory
+        )
+
+        # NOTE: A checkpoint only holds the objects of the subproblems, so it can only be resumed on the same dataset,
+        #       and with the same settings of the budget search, which the subtrees already built depend on
+        header = {
+            "dataset": dataset._path,
+            "objects": dataset.objects.to_bytes(),
+            "tests": list(tests),
+            "costs": dict(costs),
+            "max_depth": context.max_depth,
+            "epsilon": epsilon,
+            "seed": seed,
+            "workers": workers,
+            "min_search_cost": min_search_cost,
+            "min_search_pairs": min_search_pairs,
+            "propagate_budget": propagate_budget
+        }
+
+        state: Optional[tuple[Tree, list[BuildTask]]] = None
+        if resume_from is not None:
+            resumed_header, resumed_tree, resumed_tasks = BuildCheckpoint.load(resume_from)
+            if resumed_header != header:
+                raise ValueError(f"The checkpoint {resume_from} belongs to a different dataset or settings")
+
+            if resumed_tree is not None:
+                state = (resumed_tree, resumed_tasks)
+
+        try:
+            root = dataset._parent if isinstance(dataset, DatasetView) else dataset
+            if build_workers > 1:
+                # NOTE: The workers are forked where possible, so that they inherit the dataset instead of unpickling
+                #       it, and only receive the objects of each subproblem
+                self._executor = ProcessPoolExecutor(
+                    build_workers,
+                    mp_context=get_context("fork") if "fork" in get_all_start_methods() else None,
+                    initializer=_init_build_worker,
+                    initargs=(copy(self), root, context)
+                )
+
+            if workers > 1 and epsilon is not None:
+                # NOTE: The budget searches of all the subproblems built here share a pool, while the build workers
+                #       search their subproblems on their own
+                self._budget_executor = budget_executor(root, workers)
 
-        assert decision_tree.check_leaves_objects(dataset.classes), "The decision tree is not correct!"
+            if checkpoint_path is not None:
+                self._checkpoint = BuildCheckpoint(checkpoint_path, header, checkpoint_interval, state)
+
+            if state is None:
+                decision_tree, _ = self._build_decision_tree(context, dataset, tests)
+            else:
+                decision_tree = self._build_subproblems(context, dataset, *state)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+            if self._budget_executor is not None:
+                self._budget_executor.shutdown()
+                self._budget_executor = None
+
+            if self._checkpoint is not None:
+                self._checkpoint.close()
+                self._checkpoint = None
+
+        # The tree is built, so its checkpoint is of no use anymore
+        if checkpoint_path is not None:
+            Path(checkpoint_path).unlink()
+
+        logger.info("Budget searches skipped: %i", self.skipped_searches)
+        logger.info(
+            "Subproblem cache: %i hits, %i misses (hit rate %.2f)",
+            context.subproblems.hits, context.subproblems.misses, context.subproblems.hit_rate
+        )
+
+        truncated_leaves = [
+            leaf for leaf in decision_tree.leaves if decision_tree.structure.nodes[leaf].get("truncated", False)
+        ]
+        self.limit = context.limit
+        self.truncated_objects = sum(len(decision_tree.structure.nodes[leaf]["objects"]) for leaf in truncated_leaves)
+        if self.limit is not None:
+            logger.warning("Build stopped by the %s limit", self.limit)
+
+        if len(truncated_leaves) > 0:
+            # NOTE: As when pruning the nodes deeper than max_depth, the leaves still labelled by a test are
+            #       labelled with their majority class
+            logger.info(
+                "Leaves closed before being expanded: %i, with %i objects",
+                len(truncated_leaves), self.truncated_objects
+            )
+            label_test_leaves(decision_tree, dataset)
+
+        # NOTE: Only the leaves that were expanded are pure, the closed ones hold the objects of a whole subproblem
+        expanded_leaves = [
+            leaf for leaf in decision_tree.leaves
+            if not decision_tree.structure.nodes[leaf].get("truncated", False)
+            and not decision_tree.structure.nodes[leaf].get("depth_closed", False)
+        ]
+        assert decision_tree.check_leaves_objects(dataset.classes, expanded_leaves), "The decision tree is not correct!"
 
         with open(dirname(__file__) + f"/../model/{dataset_name}/{num}/not_pruned.pkl", "wb") as tree_file:
             dump(decision_tree, tree_file, HIGHEST_PROTOCOL)
 
         logger.info("Pruning resulting tree")
-        decision_tree = prune(decision_tree, dataset)
+        decision_tree = prune(decision_tree, dataset, max_depth=max_depth)
 
         logger.info("End of procedure!")
         self.decision_tree = decision_tree
@@ -313,3 +788,29 @@ class DecisionTree:
 
     def print(self) -> None:
         self.decision_tree.print()
+
+
+# The decision tree, the whole dataset and the build context shared by all the subproblems built by a worker of
+# DecisionTree.fit
+_build_worker_state: tuple[DecisionTree, Dataset, BuildContext]
+
+
+def _init_build_worker(decision_tree: DecisionTree, dataset: Dataset, context: BuildContext) -> None:
+    global _build_worker_state
+    _build_worker_state = (decision_tree, dataset, context)
+
+
+def _build_subtree_worker(
+        objects: ObjectSet,
+        tests: list[str],
+        parent_budget: Optional[float],
+        depth: int,
+        max_nodes: Optional[int]
+) -> tuple[Tree, int, Optional[str]]:
+    decision_tree, dataset, context = _build_worker_state
+    decision_tree.skipped_searches = 0
+    context.max_nodes = max_nodes
+    context.limit = None
+
+    subtree, _ = decision_tree._build_decision_tree(context, dataset.intersection(objects), tests, parent_budget, depth)
+    return subtree, decision_tree.skipped_searches, context.limit
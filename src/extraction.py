@@ -5,7 +5,7 @@ def cheapest_separation(dataset: Dataset, costs: dict[str, float], pair: tuple[i
     if len(dataset.features) == 1:
         return dataset.features[0]
 
-    separating_tests = [test for test, pairs in dataset.separated.items() if pair in pairs]
+    separating_tests = [test for test in dataset.separated_number if dataset.separates(test, pair)]
 
     if len(separating_tests) == 1:
         return separating_tests[0]
@@ -1,8 +1,12 @@
 import logging
-from pprint import pformat
+from bisect import bisect_right
+from functools import partial
+from math import ceil, log
+from random import Random
+from typing import Callable, Optional
 
 from src.dataset import Dataset
-from src.maximization import submodular_maximization
+from src.maximization import LazySubmodularMaximization, submodular_maximization
 from src.types import SubmodularFunction
 
 logger = logging.getLogger("decision_tree")
@@ -14,6 +18,9 @@ def wolsey_greedy_heuristic(
         tests: list[str],
         costs: dict[str, float],
         submodular_function: SubmodularFunction,
+        lazy: bool = True,
+        epsilon: Optional[float] = None,
+        seed: Optional[int] = None
 ) -> list[str]:
     """Implementation of the Wolsey greedy algorithm
 
@@ -23,60 +30,177 @@ def wolsey_greedy_heuristic(
         tests (list[str]): The tests for the given dataset
         costs (dict[str, float]): The costs for the tests
         submodular_function (SubmodularFunction): Submodular function to apply
+        lazy (bool, optional): Whether to re-evaluate only the marginal gains that can still be the maximum, instead
+            of all of them at each iteration. The chosen tests are the same. Defaults to True.
+        epsilon (Optional[float], optional): If given, runs the stochastic greedy: each iteration only evaluates a
+            random sample of (|T| / k) * log(1 / epsilon) tests, where k is the number of tests the budget affords,
+            losing at most epsilon in the approximation. Defaults to None.
+        seed (Optional[int], optional): Seed of the stochastic greedy sampling. Defaults to None.
 
     Returns:
         list[str]: A set of features
     """
     logger.info("Applying heuristic for budget: %f", budget)
 
-    spent = 0.0
-    auxiliary_array: list[str] = []
-    k = -1
-
     heuristic_features = [
         feature for feature in tests if costs[feature] <= budget
     ]
 
-    if len(heuristic_features) > 0:
-        while True:
-            k += 1
+    if epsilon is not None and not 0 < epsilon < 1:
+        raise ValueError(f"epsilon must be in (0, 1), got {epsilon}")
+
+    lazy_maximization = LazySubmodularMaximization()
+    maximization = lazy_maximization if lazy else submodular_maximization
+
+    if epsilon is not None and len(heuristic_features) > 0:
+        cheapest = min(costs[feature] for feature in heuristic_features)
+        affordable = len(heuristic_features) if cheapest <= 0 else min(len(heuristic_features), int(budget // cheapest))
+        sample_size = ceil(len(heuristic_features) / max(affordable, 1) * log(1 / epsilon))
+
+        maximization = partial(maximization, sample_size=sample_size, rng=Random(seed))
+
+    if len(heuristic_features) == 0:
+        return []
+
+    sequence = GreedySequence(dataset, heuristic_features, costs, maximization, submodular_function)
+    result = sequence.selection(budget)
+
+    if lazy:
+        logger.debug("Marginal gains evaluated by the lazy greedy: %i", lazy_maximization.evaluations)
+
+    return result
+
+
+class GreedySequence:
+    """The tests chosen by the greedy step of the Wolsey algorithm, computed only as far as needed
+
+    Among the same tests, the greedy always chooses them in the same order, whatever the budget: the budget only
+    decides after how many of them it stops, i.e. as soon as their total cost exceeds it. So the sequence is extended
+    on demand, recording the cumulative cost and the value of f for each of its prefixes, and the result for any
+    budget is a lookup of the right prefix followed by the final comparison of the Wolsey algorithm.
+    """
 
+    chosen: list[str]
+    coverage: list[int]
+    spent: list[float]
+    _costs: dict[str, float]
+    _dataset: Dataset
+    _maximization: Callable[[Dataset, dict[str, float], list[str], list[str]], str]
+    _remaining: list[str]
+    _singles: dict[str, int]
+    _submodular_function: SubmodularFunction
+
+    def __init__(
+            self,
+            dataset: Dataset,
+            tests: list[str],
+            costs: dict[str, float],
+            maximization: Callable[[Dataset, dict[str, float], list[str], list[str]], str],
+            submodular_function: SubmodularFunction
+    ) -> None:
+        self.chosen = []
+        self.coverage = [submodular_function(dataset, [])]
+        self.spent = []
+        self._costs = costs
+        self._dataset = dataset
+        self._maximization = maximization
+        self._remaining = list(tests)
+        self._singles = {}
+        self._submodular_function = submodular_function
+
+    def prefix(self, budget: float) -> list[str]:
+        """The tests chosen until their total cost exceeds the budget, or all the tests if it never does
+
+        Args:
+            budget (float): Budget threshold
+
+        Returns:
+            list[str]: The chosen tests, in order
+        """
+        while self._remaining and (not self.spent or self.spent[-1] <= budget):
             # Select t_k
-            chosen_test = submodular_maximization(
-                dataset,
-                costs,
-                heuristic_features,
-                auxiliary_array
-            )
+            chosen_test = self._maximization(self._dataset, self._costs, self._remaining, self.chosen)
             logger.debug("Test that maximizes the submodular function: %s", chosen_test)
 
             logger.debug("Removing t_k from T and adding it to A")
-            auxiliary_array.append(heuristic_features.pop(heuristic_features.index(chosen_test)))
-            logger.debug(f"New A list: {pformat(auxiliary_array)}")
+            self.chosen = self.chosen + [self._remaining.pop(self._remaining.index(chosen_test))]
+            logger.debug("New A list: %s", self.chosen)
 
             # Update spent
-            spent += costs[chosen_test]
-            logger.debug("Adding cost of \"%s\" to spent. Total spent: %d", chosen_test, spent)
+            self.spent.append((self.spent[-1] if self.spent else 0.0) + self._costs[chosen_test])
+            logger.debug("Adding cost of \"%s\" to spent. Total spent: %d", chosen_test, self.spent[-1])
 
-            if spent > budget or len(heuristic_features) == 0:
-                break
-    else:
-        return []
+            self.coverage.append(self._submodular_function(self._dataset, self.chosen))
+
+        return self.chosen[:bisect_right(self.spent, budget) + 1]
+
+    def selection(self, budget: float) -> list[str]:
+        """Result of the Wolsey algorithm for the given budget
+
+        Args:
+            budget (float): Budget threshold
+
+        Returns:
+            list[str]: A set of features
+        """
+        auxiliary_array = self.prefix(budget)
+        k = len(auxiliary_array) - 1
+
+        # Compute f({t_k})
+        if auxiliary_array[k] not in self._singles:
+            self._singles[auxiliary_array[k]] = self._submodular_function(self._dataset, [auxiliary_array[k]])
+        single_result = self._singles[auxiliary_array[k]]
+        logger.debug("f({t_k}): %i", single_result)
 
-    # Compute f({t_k})
-    single_result = submodular_function(dataset, [auxiliary_array[k]])
-    logger.debug("f({t_k}): %i", single_result)
+        # Look up f(A \ {t_k}), i.e. f({t_1, ..., t_(k - 1)})
+        difference_result = self.coverage[k]
+        logger.debug("f(A \\ {t_k}): %i", difference_result)
 
-    # Compute f(A \ {t_k})
-    # NOTE: We can use [:-1] since t_K is the last element of the list
-    difference_result = submodular_function(dataset, auxiliary_array[:-1])
-    logger.debug("f(A \\ {t_k}): %i", difference_result)
+        if single_result >= difference_result:
+            # Return {t_k}
+            logger.debug("Returning \"%s\"", auxiliary_array[k])
+            return [auxiliary_array[k]]
 
-    if single_result >= difference_result:
-        # Return {t_k}
-        logger.debug("Returning \"%s\"", auxiliary_array[k])
-        return [auxiliary_array[k]]
+        # Return {t_1, ..., t_(k - 1)}
+        logger.debug("Returning %s", auxiliary_array[:k])
+        return auxiliary_array[:k]
+
+
+class BreakpointWolseyHeuristic:
+    """wolsey_greedy_heuristic for all the probes of a single budget search, sharing the greedy among them
+
+    The tests the greedy chooses from only change at the distinct test costs, the breakpoints of the budget: probes
+    falling between the same two breakpoints extend a single GreedySequence, cached by breakpoint, instead of running
+    the greedy again. The results are the ones of wolsey_greedy_heuristic.
+    """
+
+    runs: int
+    _sequences: dict[float, GreedySequence]
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self._sequences = {}
+
+    def __call__(
+            self,
+            budget: float,
+            dataset: Dataset,
+            tests: list[str],
+            costs: dict[str, float],
+            submodular_function: SubmodularFunction
+    ) -> list[str]:
+        logger.info("Applying heuristic for budget: %f", budget)
+
+        heuristic_features = [feature for feature in tests if costs[feature] <= budget]
+        if len(heuristic_features) == 0:
+            return []
+
+        breakpoint = max(costs[feature] for feature in heuristic_features)
+        if breakpoint not in self._sequences:
+            logger.debug("Starting the greedy for the breakpoint %f", breakpoint)
+            self.runs += 1
+            self._sequences[breakpoint] = GreedySequence(
+                dataset, heuristic_features, costs, LazySubmodularMaximization(), submodular_function
+            )
 
-    # Return {t_1, ..., t_(k - 1)}
-    logger.debug(f"Returning {pformat(auxiliary_array[:k])}")
-    return auxiliary_array[:k]
+        return self._sequences[breakpoint].selection(budget)
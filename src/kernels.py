@@ -0,0 +1,57 @@
+import numpy as np
+
+
+def code_dtype(cardinality: int) -> np.dtype:
+    """Smallest integer type able to store the codes of a column with the given number of distinct values
+
+    Args:
+        cardinality (int): The number of distinct values of the column
+
+    Returns:
+        np.dtype: uint8, uint16 or int32
+    """
+    if cardinality <= np.iinfo(np.uint8).max + 1:
+        return np.dtype(np.uint8)
+
+    if cardinality <= np.iinfo(np.uint16).max + 1:
+        return np.dtype(np.uint16)
+
+    return np.dtype(np.int32)
+
+
+def class_histograms(class_codes: np.ndarray, subset_ids: np.ndarray, subsets_number: int,
+                     classes_number: int) -> np.ndarray:
+    """Computes the class histogram of many object subsets at once
+
+    Args:
+        class_codes (np.ndarray): The class code of each object, for all the subsets concatenated
+        subset_ids (np.ndarray): The subset each entry of class_codes belongs to
+        subsets_number (int): The number of subsets
+        classes_number (int): The number of classes
+
+    Returns:
+        np.ndarray: A (subsets_number x classes_number) matrix of class counts
+    """
+    histograms = np.bincount(
+        subset_ids.astype(np.int64) * classes_number + class_codes.astype(np.int64),
+        minlength=subsets_number * classes_number
+    )
+
+    return histograms.reshape(subsets_number, classes_number)
+
+
+def pairs_from_histograms(histograms: np.ndarray) -> np.ndarray:
+    """Number of pairs of objects with different classes, given the class histograms of the objects
+
+    A set S of objects whose classes have counts c_1, ..., c_k contains (|S|^2 - sum(c_i^2)) / 2 pairs.
+
+    Args:
+        histograms (np.ndarray): The class counts on the last axis
+
+    Returns:
+        np.ndarray: The number of pairs of each histogram
+    """
+    histograms = histograms.astype(np.int64, copy=False)
+    sizes = histograms.sum(axis=-1)
+
+    return (sizes * sizes - (histograms * histograms).sum(axis=-1)) // 2
@@ -1,74 +1,178 @@
 import logging
+from heapq import heapify, heappop, heappush
 from pprint import pformat
+from random import Random
+from typing import Optional
+
+import numpy as np
 
 from src.dataset import Dataset
+from src.kernels import pairs_from_histograms
+from src.object_set import ObjectSet
 
 logger = logging.getLogger("decision_tree")
 
 
+def marginal_gains(
+        universe: Dataset,
+        tests: list[str],
+        costs: dict[str, float],
+        objects: Optional[ObjectSet] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Cost-normalized marginal gains of all the tests at once
+
+    With U the given objects, the gain of a test t is what U loses, in pairs or in probability, when intersected with
+    S[*][t], divided by the cost of t. The class histograms of every U ∩ S[*][t] are computed as a single
+    (tests x classes) matrix, from which the remaining pairs and probabilities of all the tests follow.
+
+    Args:
+        universe (Dataset): The dataset
+        tests (list[str]): The tests to evaluate
+        costs (dict[str, float]): The costs for the tests
+        objects (Optional[ObjectSet]): The objects U. Defaults to all the objects of the universe.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The gains in pairs and in probability of each test
+    """
+    histograms, probabilities = universe.S_star_statistics(tests, objects)
+    tests_costs = np.array([costs[test] for test in tests], dtype=np.float64)
+
+    if objects is None:
+        pairs_number, total_probability = universe.pairs_number, universe.total_probability
+    else:
+        pairs_number = universe.pairs_number_for(objects)
+        total_probability = universe.intersection(objects).total_probability
+
+    pairs_gains = (pairs_number - pairs_from_histograms(histograms)) / tests_costs
+    probability_gains = (total_probability - probabilities) / tests_costs
+
+    return pairs_gains, probability_gains
+
+
 def probability_maximization(universe: Dataset, tests: list[str], costs: dict[str, float]) -> str:
-    def submodular_probabilities() -> dict[str, float]:
-        logger.debug("Computing U ∩ S[*][feature] for each feature:")
-        per_feature_intersection_probability = {
-            feature: universe.intersection(universe.S_star[feature]).total_probability
-            for feature in tests
-        }
-        logger.debug(pformat(per_feature_intersection_probability))
+    _, gains = marginal_gains(universe, tests, costs)
 
-        return {
-            feature: (universe.total_probability - per_feature_intersection_probability[feature]) / costs[feature]
-            for feature in tests
-            if feature in universe.S_star.keys()
-        }
+    # NOTE: The gains of the matrix product are exact only up to rounding errors, so the tests close to the maximum
+    #       are compared again on exactly rounded sums, breaking ties in the same way
+    tolerance = 4 * (len(universe) + 1) * np.finfo(np.float64).eps * (universe.total_probability + 1)
+    tolerance /= min(costs[test] for test in tests)
+    candidates = [test for test, gain in zip(tests, gains.tolist()) if gain >= gains.max() - tolerance]
 
-    return max(submodular_probabilities(), key=submodular_probabilities().get)
+    exact_gains = {
+        test: (
+            universe.total_probability - universe.intersection(universe.S_star[test]).total_probability
+        ) / costs[test]
+        for test in candidates
+    }
+    logger.debug(pformat(exact_gains))
 
+    return max(exact_gains, key=exact_gains.get)
 
-def pairs_maximization(universe: Dataset, tests: list[str], costs: dict[str, float]) -> str:
-    def submodular_pairs() -> dict[str, float]:
-        logger.debug("Computing U ∩ S[*][feature] for each feature:")
-        per_feature_intersection_pairs = {
-            feature: universe.intersection(universe.S_star[feature]).pairs_number
-            for feature in tests
-        }
 
-        return {
-            feature: (universe.pairs_number - per_feature_intersection_pairs[feature]) / costs[feature]
-            for feature in tests
-            if feature in universe.S_star.keys()
-        }
+def pairs_maximization(universe: Dataset, tests: list[str], costs: dict[str, float]) -> str:
+    gains, _ = marginal_gains(universe, tests, costs)
 
-    return max(submodular_pairs(), key=submodular_pairs().get)
+    return tests[int(np.argmax(gains))]
 
 
 def submodular_maximization(
         dataset: Dataset,
         costs: dict[str, float],
         heuristic_features: list[str],
-        auxiliary_features: list[str]
+        auxiliary_features: list[str],
+        sample_size: Optional[int] = None,
+        rng: Optional[Random] = None
 ) -> str:
-    logger.debug(f"Maximizing submodular function in {heuristic_features}")
-
-    maximum_eligible: dict[str, float] = {}
-    for feature in heuristic_features:
-        logger.debug("Feature: %s", feature)
-
-        # Computes P(∩ S[*][t for t in A])
-        # NOTE: 03/05/2023 - We chose to consider P(∩ S[*][t for t in A]) instead of f(A) since we can algebraically
-        #       reduce f(A U {t}) - f(A) to P(∩ S[*][t for t in A]) - P(∩ S[*][t for t in A U {t}])
-        non_union_result = dataset.pairs_number_for(dataset.S_star_intersection_for_features(auxiliary_features))
+    heuristic_features = sample_features(heuristic_features, sample_size, rng)
+
+    logger.debug("Maximizing submodular function in %s", heuristic_features)
+
+    # Computes P(∩ S[*][t for t in A]) - P(∩ S[*][t for t in A U {t}]) for all the features at once
+    # NOTE: 03/05/2023 - We chose to consider P(∩ S[*][t for t in A]) instead of f(A) since we can algebraically
+    #       reduce f(A U {t}) - f(A) to P(∩ S[*][t for t in A]) - P(∩ S[*][t for t in A U {t}])
+    gains, _ = marginal_gains(
+        dataset, heuristic_features, costs, dataset.S_star_intersection_for_features(auxiliary_features)
+    )
+    logger.debug("(f(A U {t}) - f(A)) / c(t): %s", gains)
+
+    return heuristic_features[int(np.argmax(gains))]
+
+
+def sample_features(features: list[str], sample_size: Optional[int], rng: Optional[Random]) -> list[str]:
+    """Random sample of the features, for the stochastic greedy
+
+    Args:
+        features (list[str]): The features to sample from
+        sample_size (Optional[int]): Number of features to sample, all the features if None
+        rng (Optional[Random]): The random generator to sample with
+
+    Returns:
+        list[str]: The sampled features, in their original order
+    """
+    if sample_size is None or sample_size >= len(features):
+        return features
+
+    sampled_features = set((rng or Random()).sample(features, sample_size))
+    return [feature for feature in features if feature in sampled_features]
+
+
+class LazySubmodularMaximization:
+    """Lazy-greedy (Minoux) replacement of submodular_maximization, for the iterations of a single greedy run
+
+    Since f is submodular, the marginal gain of a test can only decrease as A grows, so a gain computed in a previous
+    iteration is an upper bound of the current one. The tests are kept in a max-heap of these bounds and only the
+    ones reaching the top are re-evaluated: an up-to-date gain on top of the heap is the maximum. Ties are broken by
+    the position of the test in heuristic_features, so the same test as submodular_maximization is chosen.
+    """
+
+    evaluations: int
+    _bounds: dict[str, tuple[float, int]]
+    _iteration: int
+    _positions: dict[str, int]
+
+    def __init__(self) -> None:
+        self.evaluations = 0
+        self._bounds = {}
+        self._iteration = -1
+        self._positions = {}
+
+    def __call__(
+            self,
+            dataset: Dataset,
+            costs: dict[str, float],
+            heuristic_features: list[str],
+            auxiliary_features: list[str],
+            sample_size: Optional[int] = None,
+            rng: Optional[Random] = None
+    ) -> str:
+        self._iteration += 1
+
+        if not self._positions:
+            self._positions = {feature: position for position, feature in enumerate(heuristic_features)}
+
+        # Heap entries are (-bound, position, test), the bounds of the tests never evaluated being infinite
+        heap = [
+            (-self._bounds.get(feature, (float("inf"), -1))[0], self._positions[feature], feature)
+            for feature in sample_features(heuristic_features, sample_size, rng)
+        ]
+        heapify(heap)
+
+        # Computes P(∩ S[*][t for t in A]) once for the iteration
+        auxiliary_intersection = dataset.S_star_intersection_for_features(auxiliary_features)
+        non_union_result = dataset.pairs_number_for(auxiliary_intersection)
         logger.debug("P(∩ S[*][t for t in A]): %i", non_union_result)
 
-        # Computes P(∩ S[*][t for t in A U {t}])
-        # NOTE: 03/05/2023 - We chose to consider P(∩ S[*][t for t in A U {t}]) instead of f(A U {t}) since we can
-        #       algebraically reduce f(A U {t}) - f(A) to P(∩ S[*][t for t in A]) - P(∩ S[*][t for t in A U {t}])
-        union_result = dataset.pairs_number_for(
-            dataset.S_star_intersection_for_features(auxiliary_features + [feature]))
-        logger.debug("P(∩ S[*][t for t in A U {t}]): %i", union_result)
+        while True:
+            bound, position, feature = heappop(heap)
+            if self._bounds.get(feature, (None, -1))[1] == self._iteration:
+                logger.debug("Test with the maximum (lazily evaluated) gain: %s, %f", feature, -bound)
+                return feature
+
+            union_result = dataset.pairs_number_for(auxiliary_intersection & dataset.S_star[feature])
+            self.evaluations += 1
 
-        submodular_result = (non_union_result - union_result) / costs[feature]
-        logger.debug("(f(A U {t}) - f(A)) / %f = %f", costs[feature], submodular_result)
-        maximum_eligible[feature] = submodular_result
+            submodular_result = (non_union_result - union_result) / costs[feature]
+            logger.debug("(f(A U {%s}) - f(A)) / %f = %f", feature, costs[feature], submodular_result)
 
-    logger.debug(f"\n{pformat(maximum_eligible)}")
-    return max(maximum_eligible, key=maximum_eligible.get)
+            self._bounds[feature] = (submodular_result, self._iteration)
+            heappush(heap, (-submodular_result, position, feature))
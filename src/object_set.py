@@ -0,0 +1,151 @@
+from typing import Any, Iterable, Iterator, Mapping, Self
+
+import numpy as np
+
+WORD_BITS = 64
+
+
+class ObjectSet:
+    """A set of objects indexes backed by a packed bitmap
+
+    Object i is stored as bit (i % 64) of the (i // 64)-th 64-bit word, so intersection, union, difference, equality
+    and cardinality all cost O(size / 64) word operations.
+    """
+
+    __slots__ = ("_size", "_words")
+
+    _size: int
+    _words: np.ndarray
+
+    def __init__(self, words: np.ndarray, size: int) -> None:
+        self._size = size
+        self._words = words
+
+    @classmethod
+    def empty(cls, size: int) -> Self:
+        """Constructs an empty set
+
+        Args:
+            size (int): Number of objects in the universe of the set
+
+        Returns:
+            ObjectSet: The empty set
+        """
+        return cls(np.zeros(-(-size // WORD_BITS), dtype="<u8"), size)
+
+    @classmethod
+    def from_indexes(cls, indexes: Iterable[int], size: int) -> Self:
+        """Constructs a set from the indexes of its objects
+
+        Args:
+            indexes (Iterable[int]): The indexes of the objects in the set
+            size (int): Number of objects in the universe of the set
+
+        Returns:
+            ObjectSet: The set of the given objects
+        """
+        indexes = np.asarray(indexes if isinstance(indexes, np.ndarray) else list(indexes), dtype=np.int64)
+
+        words = np.zeros(-(-size // WORD_BITS), dtype="<u8")
+        np.bitwise_or.at(words, indexes // WORD_BITS, np.left_shift(np.uint64(1), (indexes % WORD_BITS).astype("<u8")))
+
+        return cls(words, size)
+
+    def __and__(self, other: Self) -> Self:
+        return ObjectSet(self._words & other._words, self._size)
+
+    def __bool__(self) -> bool:
+        return bool(self._words.any())
+
+    def __contains__(self, index: int) -> bool:
+        if not 0 <= index < self._size:
+            return False
+
+        return bool((self._words[index // WORD_BITS] >> np.uint64(index % WORD_BITS)) & np.uint64(1))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ObjectSet):
+            return NotImplemented
+
+        return self._size == other._size and np.array_equal(self._words, other._words)
+
+    def __isub__(self, other: Self) -> Self:
+        self._words &= ~other._words
+        return self
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.tolist())
+
+    def __len__(self) -> int:
+        return int(np.bitwise_count(self._words).sum())
+
+    def __or__(self, other: Self) -> Self:
+        return ObjectSet(self._words | other._words, self._size)
+
+    def __repr__(self) -> str:
+        return f"ObjectSet({self.tolist()})"
+
+    def __sub__(self, other: Self) -> Self:
+        return ObjectSet(self._words & ~other._words, self._size)
+
+    def copy(self) -> Self:
+        return ObjectSet(self._words.copy(), self._size)
+
+    def to_bytes(self) -> bytes:
+        """Canonical bytes of the set, equal for equal sets over the same universe"""
+        return self._words.tobytes()
+
+    def to_array(self) -> np.ndarray:
+        """Sorted array of the indexes of the objects in the set
+
+        NOTE: Only the non-empty words are unpacked, so a small set costs O(size / 64 + its length)
+        """
+        words = np.flatnonzero(self._words)
+        rows, bits = np.nonzero(
+            np.unpackbits(self._words[words].view(np.uint8), bitorder="little").reshape(-1, WORD_BITS)
+        )
+
+        return words[rows] * WORD_BITS + bits
+
+    def tolist(self) -> list[int]:
+        """Sorted list of the indexes of the objects in the set"""
+        return self.to_array().tolist()
+
+    @property
+    def size(self) -> int:
+        """Number of objects in the universe of the set"""
+        return self._size
+
+
+class MaskedObjectSets(Mapping):
+    """A read-only mapping of ObjectSets, each one intersected with a given set of objects on first access
+
+    Nested mappings of ObjectSets are masked recursively, so that a whole separation dictionary can be restricted
+    to a subset of the objects without touching the sets that are never read.
+    """
+
+    _masked: dict[Any, Any]
+    _objects: ObjectSet
+    _source: Mapping[Any, Any]
+
+    def __init__(self, source: Mapping[Any, Any], objects: ObjectSet) -> None:
+        self._masked = {}
+        self._objects = objects
+        self._source = source
+
+    def __getitem__(self, key: Any) -> Any:
+        if key not in self._masked:
+            value = self._source[key]
+
+            if isinstance(value, ObjectSet):
+                self._masked[key] = value & self._objects
+            else:
+                self._masked[key] = MaskedObjectSets(value, self._objects)
+
+        return self._masked[key]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._source)
+
+    def __len__(self) -> int:
+        return len(self._source)
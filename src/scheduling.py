@@ -0,0 +1,238 @@
+import sys
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from heapq import heappop, heappush
+from itertools import count
+from threading import Lock
+from time import monotonic
+from typing import Any, Hashable, Optional
+from uuid import UUID
+
+try:
+    from resource import RUSAGE_SELF, getrusage
+except ImportError:
+    # NOTE: Not available on Windows, where the memory ceiling of a build is not enforced
+    getrusage = None
+
+from src.object_set import ObjectSet
+from src.tree import Tree
+
+# Default maximum number of subproblems kept by a SubproblemCache
+SUBPROBLEM_CACHE_SIZE = 1024
+
+
+@dataclass(repr=False, slots=True)
+class BuildTask:
+    """A subproblem of the tree construction, whose subtree is grafted on the parent node through the edge label
+
+    Only the objects of the subproblem are kept, its dataset being derived from the whole one when the task is built.
+    The depth is the one of the root of its subtree in the whole tree.
+    """
+
+    objects: ObjectSet
+    tests: list[str]
+    pairs_number: int
+    parent_budget: Optional[float] = None
+    parent: Optional[UUID] = None
+    label: Optional[str] = None
+    depth: int = 0
+
+
+class BuildQueue(ABC):
+    """Scheduling policy of the tree construction: the order in which the pending subproblems are built"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def pop(self) -> BuildTask:
+        ...
+
+    @abstractmethod
+    def push(self, task: BuildTask) -> None:
+        ...
+
+
+class DepthFirstQueue(BuildQueue):
+    """Builds the last subproblem found first, keeping few subproblems pending
+
+    NOTE: Like the recursive construction, a subtree is finished before its siblings are started, but the siblings are
+          taken in reverse order: the last subproblem of a backbone comes first.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: list[BuildTask] = []
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def pop(self) -> BuildTask:
+        return self._tasks.pop()
+
+    def push(self, task: BuildTask) -> None:
+        self._tasks.append(task)
+
+
+class BreadthFirstQueue(BuildQueue):
+    """Builds the subproblems level by level"""
+
+    def __init__(self) -> None:
+        self._tasks: deque[BuildTask] = deque()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def pop(self) -> BuildTask:
+        return self._tasks.popleft()
+
+    def push(self, task: BuildTask) -> None:
+        self._tasks.append(task)
+
+
+class LargestFirstQueue(BuildQueue):
+    """Builds the subproblems with the most pairs first, so that the longest builds start as soon as possible"""
+
+    def __init__(self) -> None:
+        self._tasks: list[tuple[int, int, BuildTask]] = []
+        self._order = count()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def pop(self) -> BuildTask:
+        return heappop(self._tasks)[2]
+
+    def push(self, task: BuildTask) -> None:
+        # Ties are broken by insertion order
+        heappush(self._tasks, (-task.pairs_number, next(self._order), task))
+
+
+SCHEDULING_POLICIES: dict[str, type[BuildQueue]] = {
+    "depth-first": DepthFirstQueue,
+    "breadth-first": BreadthFirstQueue,
+    "largest-first": LargestFirstQueue
+}
+
+
+class SubproblemCache:
+    """LRU cache of the backbones built for the subproblems, with the subproblems left out of each of them
+
+    The same objects are often reached with the same tests through different paths of the tree: since the backbone
+    of a subproblem only depends on its objects, its tests, the costs and the settings of the budget search, it is
+    built once and then shared.
+    """
+
+    hits: int
+    misses: int
+    _entries: OrderedDict[Hashable, tuple[Tree, list[BuildTask]]]
+    _lock: Lock
+    _maxsize: int
+
+    def __init__(self, maxsize: int = SUBPROBLEM_CACHE_SIZE) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._maxsize = maxsize
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {key: value for key, value in self.__dict__.items() if key != "_lock"}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drops the cached backbones, keeping the hit and miss counters"""
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key: Hashable) -> Optional[tuple[Tree, list[BuildTask]]]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, entry: tuple[Tree, list[BuildTask]]) -> None:
+        if self._maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / max(self.hits + self.misses, 1)
+
+
+@dataclass(repr=False)
+class BuildContext:
+    """What the construction of a tree depends on besides the dataset, carried through all its subproblems
+
+    Nothing is read from module globals, and both the subproblem cache and the intersection cache of a dataset are
+    guarded by locks, so that trees on different datasets, folds or hyperparameters can be built at the same time in
+    one process, sharing the caches. The limits of an anytime build are checked before each subproblem, each node of a
+    backbone and each round of a budget search: once one of them is reached, the backbone stops and the pending
+    subproblems are closed as leaves instead of being built.
+    """
+
+    # All the tests, the ones of the subproblems left out of a backbone
+    tests: list[str]
+    costs: dict[str, float]
+    # Depth of the nodes closed as leaves, None to expand all the nodes
+    max_depth: Optional[int] = None
+    subproblems: SubproblemCache = field(default_factory=SubproblemCache)
+    # Value of time.monotonic after which the build stops, maximum number of nodes and peak memory in bytes
+    deadline: Optional[float] = None
+    max_nodes: Optional[int] = None
+    max_memory: Optional[int] = None
+    # The first limit reached, one of "deadline", "nodes" and "memory"
+    limit: Optional[str] = field(default=None, init=False)
+    # The costs as a key of the subproblem cache, compared in full so that different costs never share an entry
+    costs_key: tuple[tuple[str, float], ...] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.costs_key = tuple(sorted(self.costs.items()))
+
+    def limit_reached(self, nodes: int = 0) -> bool:
+        """Whether a limit of the build is reached, recording the first one
+
+        Args:
+            nodes (int, optional): The number of nodes the tree would have, counting a leaf for each of its pending
+                subproblems. Defaults to 0.
+
+        Returns:
+            bool: True if the pending subproblems are to be closed
+        """
+        if self.limit is None:
+            if self.deadline is not None and monotonic() >= self.deadline:
+                self.limit = "deadline"
+            elif self.max_nodes is not None and nodes > self.max_nodes:
+                self.limit = "nodes"
+            elif self.max_memory is not None and (peak_memory() or 0) >= self.max_memory:
+                self.limit = "memory"
+
+        return self.limit is not None
+
+
+def peak_memory() -> Optional[int]:
+    """Peak resident memory of the process in bytes, None where it cannot be measured"""
+    if getrusage is None:
+        return None
+
+    peak = getrusage(RUSAGE_SELF).ru_maxrss
+    # NOTE: ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
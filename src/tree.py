@@ -44,14 +44,14 @@ class Tree:
 
         self.structure.add_edge(last_added_node, subtree.root, label=label)
 
-    def check_leaves_objects(self, classes: dict[int, str]) -> bool:
-        leaves = {
+    def check_leaves_objects(self, classes: dict[int, str], leaves: Optional[list[UUID]] = None) -> bool:
+        leaves_objects = {
             str(self.get_label_of_node(leaf)) + choice(string.ascii_lowercase): sorted(
                 self.structure.nodes[leaf]["objects"])
-            for leaf in self.leaves
+            for leaf in (self.leaves if leaves is None else leaves)
         }
 
-        for class_, objects in leaves.items():
+        for class_, objects in leaves_objects.items():
             for obj in objects:
                 if class_[:-1] != str(classes[obj]):
                     return False
@@ -61,6 +61,16 @@ class Tree:
     def copy(self) -> Self:
         return deepcopy(self)
 
+    def relabelled(self) -> tuple[Self, dict[UUID, UUID]]:
+        """Returns a copy of the tree with new node identifiers, whose nodes share the objects of the original ones,
+        together with the new identifier of each node"""
+        mapping = {node: uuid4() for node in self.structure.nodes}
+
+        tree = Tree()
+        tree.structure = nx.relabel_nodes(self.structure, mapping)
+
+        return tree, mapping
+
     def get_label_of_node(self, node: UUID) -> str:
         return self.structure.nodes[node]["label"]
 
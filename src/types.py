@@ -18,8 +18,7 @@ HeuristicFunction = Callable[
     [float, Dataset, list[str], dict[str, float], SubmodularFunction], list[str]
 ]
 
-PicklePairs = dict[Literal["pairs"], list[list[int]]]
 PickleSeparation = dict[
-    Literal["S_label", "S_star", "sigma", "separated", "kept"],
-    dict[str, list[Any | tuple]]
+    Literal["S_label", "S_star", "sigma", "label_codes", "star_codes", "separated_number", "kept_number"],
+    dict[str, Any]
 ]
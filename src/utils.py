@@ -1,12 +1,15 @@
 import logging
-from collections import Counter
-from itertools import chain
+from collections import Counter, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
 from math import fsum
+from multiprocessing import get_all_start_methods, get_context
+from typing import Callable, Optional
 
 import networkx as nx
 
 from src import MAX_DEPTH
 from src.dataset import Dataset
+from src.object_set import ObjectSet
 from src.tree import Tree
 from src.types import Bounds, HeuristicFunction
 
@@ -41,15 +44,28 @@ def binary_search_budget(
         costs: dict[str, float],
         search_range: Bounds,
         heuristic: HeuristicFunction,
+        workers: int = 1,
+        executor: Optional[Executor] = None,
+        stop: Optional[Callable[[], bool]] = None
 ) -> float:
     """Calculates the procedure's budget via Binary Search
 
+    With an executor, each round probes at the same time as many budgets of the bisection as there are workers, taken
+    level by level from the current range, so that the search takes fewer rounds and still ends on the budget of the
+    plain binary search. It only pays off when a probe costs more than sending it to a worker, i.e. with a heuristic
+    running anew at each probe, and with as many CPUs as workers.
+
     Args:
         dataset (Dataset): The dataset on which the decision is being built
         tests (list[str]): The tests for the given dataset
         costs (dict[str, float]): The costs for the tests
         search_range (list[float]): Range in which the binary search is performed
         heuristic (HeuristicFunction): Heuristic function
+        workers (int, optional): Number of budgets probed at the same time. Defaults to 1.
+        executor (Optional[Executor], optional): Pool started by budget_executor on the whole dataset, in which the
+            budgets are probed. Defaults to None.
+        stop (Optional[Callable[[], bool]], optional): Checked before each round of probes, ending the search early
+            on the budget reached so far once it is true. Defaults to None.
 
     Returns:
         float: The optimal budget for the procedure
@@ -58,30 +74,109 @@ def binary_search_budget(
     # Should be (1 - e^{chi}), approximated with 0.35 in the paper
     alpha = 0.35
 
-    budgets = [search_range.upper]
-    i = 1
+    budget = search_range.upper
 
     while search_range.upper >= search_range.lower + 1:
-        budgets.append((search_range.lower + search_range.upper) / 2)
+        if stop is not None and stop():
+            logger.info("Budget search stopped on budget %f", budget)
+            break
 
-        heuristic_result = heuristic(budgets[i], dataset, tests, costs, submodular_function_1)
-        logger.debug(f"Heuristic result: {heuristic_result}")
+        budgets = _bisection_budgets(search_range.lower, search_range.upper, workers if executor is not None else 1)
+        if executor is None:
+            covered = [_covered_pairs_for_budget(probe, dataset, tests, costs, heuristic) for probe in budgets]
+        else:
+            futures = [
+                executor.submit(_budget_worker, probe, dataset.objects, tests, costs, heuristic) for probe in budgets
+            ]
+            covered = [future.result() for future in futures]
+        covered_by_budget = dict(zip(budgets, covered))
 
-        covered_pairs = [set(dataset.kept[test] + dataset.separated[test]) for test in heuristic_result]
-        covered_pairs = set(chain(*covered_pairs))
+        # Walks down the bisection as long as its budgets were probed in this round
+        while search_range.upper >= search_range.lower + 1:
+            budget = (search_range.lower + search_range.upper) / 2
+            if budget not in covered_by_budget:
+                break
 
-        logger.debug(f"Pairs covered by the heuristic: {covered_pairs}")
+            # The budget becomes the upper-bound if its heuristic covers too few pairs, the lower-bound otherwise
+            if covered_by_budget[budget] < (alpha * dataset.pairs_number):
+                logger.debug("Updating upper-bound as %d", budget)
+                search_range.upper = budget
+            else:
+                logger.debug("Updating lower-bound as %d", budget)
+                search_range.lower = budget
 
-        if len(covered_pairs) < (alpha * dataset.pairs_number):
-            logger.debug("Updating upper-bound as %d", budgets[i])
-            search_range.upper = budgets[i]
-        else:
-            logger.debug("Updating lower-bound as %d", budgets[i])
-            search_range.lower = budgets[i]
+    return budget
+
+
+def budget_executor(dataset: Dataset, workers: int) -> ProcessPoolExecutor:
+    """Starts a pool of processes probing the budgets of binary_search_budget, for any subset of the dataset
+
+    The dataset is handed to the processes once, when they start, so each probe only sends the objects of its search.
+
+    Args:
+        dataset (Dataset): The whole dataset
+        workers (int): Number of processes
+
+    Returns:
+        ProcessPoolExecutor: The pool, to be shut down by the caller
+    """
+    return ProcessPoolExecutor(
+        workers,
+        mp_context=get_context("fork") if "fork" in get_all_start_methods() else None,
+        initializer=_init_budget_worker,
+        initargs=(dataset,)
+    )
+
+
+def _bisection_budgets(lower: float, upper: float, number: int) -> list[float]:
+    """The first budgets the binary search can probe starting from the given range, level by level"""
+    budgets = []
+    ranges = deque([(lower, upper)])
+    while ranges and len(budgets) < number:
+        lower, upper = ranges.popleft()
+        if upper < lower + 1:
+            continue
+
+        middle = (lower + upper) / 2
+        budgets.append(middle)
+        ranges.extend([(lower, middle), (middle, upper)])
+
+    return budgets
 
-        i += 1
 
-    return budgets[i - 1]
+def _covered_pairs_for_budget(
+        budget: float,
+        dataset: Dataset,
+        tests: list[str],
+        costs: dict[str, float],
+        heuristic: HeuristicFunction
+) -> int:
+    heuristic_result = heuristic(budget, dataset, tests, costs, submodular_function_1)
+    logger.debug(f"Heuristic result: {heuristic_result}")
+
+    covered_pairs = dataset.covered_pairs_number_for(heuristic_result)
+    logger.debug(f"Pairs covered by the heuristic: {covered_pairs}")
+
+    return covered_pairs
+
+
+# The whole dataset, whose subsets are searched by a worker of budget_executor
+_budget_worker_dataset: Dataset
+
+
+def _init_budget_worker(dataset: Dataset) -> None:
+    global _budget_worker_dataset
+    _budget_worker_dataset = dataset
+
+
+def _budget_worker(
+        budget: float,
+        objects: ObjectSet,
+        tests: list[str],
+        costs: dict[str, float],
+        heuristic: HeuristicFunction
+) -> int:
+    return _covered_pairs_for_budget(budget, _budget_worker_dataset.intersection(objects), tests, costs, heuristic)
 
 
 def get_backbone_label(dataset: Dataset, feature: str) -> str:
@@ -127,23 +222,29 @@ def compute_cutoff_metrics(tree: nx.DiGraph, node, objects_number: int, epsilon:
         compute_cutoff_metrics(tree, child, objects_number, epsilon)
 
 
-def remove_exceeding_nodes(tree: Tree, dataset: Dataset) -> None:
+def remove_exceeding_nodes(tree: Tree, dataset: Dataset, max_depth: int = MAX_DEPTH) -> None:
     exceeding_nodes = [
         node
         for node in tree.structure.nodes
-        if tree.structure.nodes[node]["depth"] > MAX_DEPTH
+        if tree.structure.nodes[node]["depth"] > max_depth
     ]
 
     if len(exceeding_nodes) > 0:
         tree.structure.remove_nodes_from(exceeding_nodes)
+        label_test_leaves(tree, dataset)
+
 
-        classes = set(map(str, dataset.classes.values()))
-        for leaf in tree.leaves:
-            if tree.structure.nodes[leaf]["label"] not in classes:
-                leaf_classes = [str(dataset.classes[obj]) for obj in tree.structure.nodes[leaf]["objects"]]
+def majority_class(dataset: Dataset, objects: list[int]) -> str:
+    """Most represented class among the objects, ties going to the class met first"""
+    return Counter([str(dataset.classes[obj]) for obj in objects]).most_common(1)[0][0]
 
-                class_counter = Counter(leaf_classes)
-                tree.structure.nodes[leaf]["label"] = class_counter.most_common(1)[0][0]
+
+def label_test_leaves(tree: Tree, dataset: Dataset) -> None:
+    """Labels the leaves still labelled by a test with the majority class of their objects"""
+    classes = set(map(str, dataset.classes.values()))
+    for leaf in tree.leaves:
+        if tree.structure.nodes[leaf]["label"] not in classes:
+            tree.structure.nodes[leaf]["label"] = majority_class(dataset, tree.structure.nodes[leaf]["objects"])
 
 
 def remove_successors(tree: Tree, node):
@@ -175,9 +276,9 @@ def cutoff(tree: Tree, dataset: Dataset, node) -> None:
         cutoff(tree, dataset, node_successor)
 
 
-def prune(tree: Tree, dataset: Dataset, epsilon: float = 1) -> Tree:
+def prune(tree: Tree, dataset: Dataset, epsilon: float = 1, max_depth: int = MAX_DEPTH) -> Tree:
     set_depths(tree.structure, tree.root)
-    remove_exceeding_nodes(tree, dataset)
+    remove_exceeding_nodes(tree, dataset, max_depth)
 
     compute_cutoff_metrics(tree.structure, tree.root, len(dataset), epsilon)
     cutoff(tree, dataset, tree.root)
@@ -198,11 +299,13 @@ def prune(tree: Tree, dataset: Dataset, epsilon: float = 1) -> Tree:
             counter = Counter(leaves_classes)
             tree.structure.nodes[leaf]["label"] = str(counter.most_common()[0][0])
 
+    # NOTE: A tree made of a single leaf, as the one of a build stopped by a limit before its root, is kept
     leftout = [
         node
         for node in tree.structure.nodes
         if tree.structure.in_degree(node) == 0 and tree.structure.out_degree(node) < 2
     ]
-    tree.structure.remove_nodes_from(leftout)
+    if len(leftout) < tree.structure.number_of_nodes():
+        tree.structure.remove_nodes_from(leftout)
 
     return tree
@@ -0,0 +1,89 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from src.checkpoint import BuildCheckpoint
+from src.dataset import Dataset
+from src.decision_tree import DecisionTree
+from src.scheduling import BuildContext
+from tests.utils import fit_model, tree_nodes
+
+
+class TestCheckpoint(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.dataset = Dataset(Path("data/test.csv"))
+
+    def test_resume(self) -> None:
+        tree, _ = DecisionTree()._build_decision_tree(
+            BuildContext(self.dataset.features, self.dataset.costs), self.dataset, self.dataset.features
+        )
+
+        with TemporaryDirectory() as directory:
+            path = f"{directory}/checkpoint.pkl"
+
+            # The build is interrupted right after the root backbone, whose subproblems fill the node budget as leaves
+            backbone, _, subtasks = DecisionTree()._build_node(
+                BuildContext(self.dataset.features, self.dataset.costs), self.dataset, self.dataset.features
+            )
+            decision_tree = DecisionTree()
+            decision_tree._checkpoint = BuildCheckpoint(path, {"dataset": "test"}, interval=0.0)
+            context = BuildContext(
+                self.dataset.features, self.dataset.costs,
+                max_nodes=backbone.structure.number_of_nodes() + len(subtasks)
+            )
+            decision_tree._build_decision_tree(context, self.dataset, self.dataset.features)
+            decision_tree._checkpoint.close()
+
+            # A write cut halfway is ignored
+            with open(path, "ab") as checkpoint_file:
+                checkpoint_file.write(b"\x80\x05\x95")
+
+            header, partial_tree, tasks = BuildCheckpoint.load(path)
+            self.assertDictEqual(header, {"dataset": "test"})
+            self.assertGreater(len(tasks), 0)
+            self.assertTrue(all(
+                not partial_tree.structure.nodes[node].get("truncated", False) for node in partial_tree.structure.nodes
+            ))
+
+            resumed_tree = DecisionTree()._build_subproblems(
+                BuildContext(self.dataset.features, self.dataset.costs), self.dataset, partial_tree, tasks
+            )
+
+        self.assertListEqual(tree_nodes(resumed_tree), tree_nodes(tree))
+
+    def test_resumed_fit(self) -> None:
+        with TemporaryDirectory() as directory:
+            path = f"{directory}/checkpoint.pkl"
+
+            # The fit is interrupted right after the root backbone
+            with patch.object(DecisionTree, "_build_task", side_effect=RuntimeError), self.assertRaises(RuntimeError):
+                fit_model(self.dataset, checkpoint_path=path, checkpoint_interval=0.0)
+
+            with self.assertRaises(ValueError):
+                fit_model(self.dataset, epsilon=0.5, resume_from=path)
+
+            # Once the tree is built its checkpoint is removed
+            resumed_fit = fit_model(self.dataset, checkpoint_path=path, resume_from=path)
+            self.assertFalse(Path(path).exists())
+
+        self.assertListEqual(tree_nodes(resumed_fit.decision_tree), tree_nodes(fit_model(self.dataset).decision_tree))
+
+    def test_rejected_checkpoint(self) -> None:
+        with TemporaryDirectory() as directory:
+            path = f"{directory}/checkpoint.pkl"
+            BuildCheckpoint(path, {"dataset": "other"}).close()
+
+            # The checkpoint is rejected before the workers are started
+            decision_tree = DecisionTree()
+            with self.assertRaises(ValueError):
+                decision_tree.fit(
+                    self.dataset, self.dataset.features, self.dataset.costs, "test", 0, build_workers=2,
+                    resume_from=path
+                )
+            self.assertIsNone(decision_tree._executor)
+
+
+if __name__ == "__main__":
+    main()
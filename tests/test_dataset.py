@@ -1,7 +1,10 @@
 from pathlib import Path
+from pickle import dumps, loads
 from unittest import TestCase, main
 
-from src.dataset import Dataset
+import numpy as np
+
+from src.dataset import Dataset, DatasetView
 
 
 class TestDataset(TestCase):
@@ -23,10 +26,19 @@ class TestDataset(TestCase):
 
         self.assertListEqual(self.dataset.features, default_features)
         self.assertDictEqual(self.dataset.classes, default_classes)
-        self.assertListEqual(self.dataset._probabilities, default_probabilities)
+        self.assertListEqual(self.dataset._probabilities.tolist(), default_probabilities)
         self.assertEqual(self.dataset.total_probability, sum(default_probabilities))
         self.assertEqual(self.dataset.data().tolist(), default_data)
 
+    def test_columns(self) -> None:
+        for feature in self.dataset.features:
+            self.assertEqual(self.dataset._columns[feature].dtype, np.uint8)
+            self.assertListEqual(self.dataset._labels[feature].tolist(), [1, 2])
+
+        self.assertListEqual(self.dataset._columns["t1"].tolist(), [0, 0, 1, 0, 1])
+        self.assertListEqual(self.dataset._class_codes.tolist(), [0, 0, 1, 2, 2])
+        self.assertListEqual(self.dataset._class_labels.tolist(), ["A", "B", "C"])
+
     def test_drop_feature(self) -> None:
         dataset_copy = self.dataset.copy()
         dataset_copy.drop_feature("t1")
@@ -145,6 +157,47 @@ class TestDataset(TestCase):
             "Error dropping row 4"
         )
 
+    def test_drop_rows(self) -> None:
+        dataset_copy = self.dataset.copy()
+        dataset_copy.drop_rows([3, 0])
+        self.assertEqual(
+            dataset_copy.data().tolist(),
+            [
+                [1, 1, 2, 1],
+                [2, 2, 2, 1],
+                [4, 2, 2, 2]
+            ]
+        )
+        self.assertDictEqual(dataset_copy.classes, {1: "A", 2: "B", 4: "C"})
+        self.assertListEqual(dataset_copy.pairs_list, [(1, 2), (1, 4), (2, 4)])
+        self.assertListEqual(dataset_copy.S_label["t1"]["1"].tolist(), [1])
+        self.assertListEqual(dataset_copy.S_star["t1"].tolist(), [1])
+        self.assertListEqual(dataset_copy.sigma["t3"].tolist(), [1, 2])
+
+        with self.assertRaises(IndexError):
+            dataset_copy.drop_rows([0])
+
+    def test_drop_equal_objects_with_different_class(self) -> None:
+        dataset_copy = self.dataset.copy()
+        dataset_copy.drop_feature("t1")
+        dataset_copy.drop_feature("t3")
+
+        # Rows 1, 2, 3 and 4 are equal, and B is the least frequent of their classes
+        dataset_copy.drop_equal_objects_with_different_class()
+        self.assertDictEqual(dataset_copy.classes, {0: "A", 2: "B"})
+        self.assertListEqual(dataset_copy.pairs_list, [(0, 2)])
+
+    def test_select_rows(self) -> None:
+        dataset_copy = self.dataset.copy()
+        dataset_copy.select_rows(np.array([False, True, True, False, True]))
+        self.assertListEqual(dataset_copy.indexes.tolist(), [1, 2, 4])
+        self.assertListEqual(dataset_copy._positions.tolist(), [-1, 0, 1, -1, 2])
+
+        dataset_copy.drop_indexes([1])
+        self.assertListEqual(dataset_copy.indexes.tolist(), [1, 4])
+        self.assertListEqual(dataset_copy._probabilities.tolist(), [0.2, 0.05])
+        self.assertEqual(dataset_copy.pairs_number, 1)
+
     def test_difference(self) -> None:
         dataset_copy = self.dataset.copy()
         dataset_copy.drop_row(2)
@@ -183,6 +236,82 @@ class TestDataset(TestCase):
             [[4, 2, 2, 2]]
         )
 
+    def test_intersection_view(self) -> None:
+        view = self.dataset.intersection([1, 2, 3, 4])
+        self.assertIsInstance(view, DatasetView)
+        self.assertEqual(len(view), 4)
+        self.assertEqual(view.pairs_number, 5)
+        self.assertDictEqual(view.classes, {1: "A", 2: "B", 3: "C", 4: "C"})
+        self.assertAlmostEqual(view.total_probability, 0.9)
+        self.assertListEqual(view.S_label["t1"]["1"].tolist(), [1, 3])
+        self.assertListEqual(view.S_star["t3"].tolist(), [3, 4])
+        self.assertListEqual(view.sigma["t2"].tolist(), [])
+
+        nested_view = view.intersection(view.S_star["t1"])
+        self.assertListEqual(nested_view.data().tolist(), [[1, 1, 2, 1], [3, 1, 2, 2]])
+        self.assertEqual(nested_view.pairs_number, 1)
+        self.assertListEqual(nested_view.pairs_list, [(1, 3)])
+
+        # The parent dataset is left untouched
+        self.assertEqual(len(self.dataset), 5)
+        self.assertListEqual(self.dataset.S_label["t1"]["1"].tolist(), [0, 1, 3])
+
+    def test_pickled_view(self) -> None:
+        view = self.dataset.intersection([1, 2, 3, 4])
+        pickled = dumps(view)
+        self.assertLess(len(pickled), len(dumps(self.dataset)))
+
+        # The parent is read back from its file
+        unpickled = loads(pickled)
+        self.assertIsInstance(unpickled, DatasetView)
+        self.assertEqual(unpickled.objects, view.objects)
+        self.assertListEqual(unpickled.data().tolist(), view.data().tolist())
+        self.assertEqual(unpickled.pairs_number, view.pairs_number)
+        self.assertListEqual(unpickled.S_star["t3"].tolist(), view.S_star["t3"].tolist())
+
+    def test_k_fold_split(self) -> None:
+        folds = self.dataset.k_fold_split(5)
+        self.assertEqual(len(folds), 5)
+
+        for fold in folds:
+            self.assertIsInstance(fold["train"], DatasetView)
+            self.assertIsInstance(fold["test"], DatasetView)
+            self.assertIs(fold["train"]._separation, self.dataset._separation)
+            self.assertEqual(len(fold["test"]), 1)
+            self.assertEqual(fold["train"].objects | fold["test"].objects, self.dataset.objects)
+
+        self.assertListEqual(sorted(fold["test"].indexes[0] for fold in folds), [0, 1, 2, 3, 4])
+
+    def test_S_star_statistics(self) -> None:
+        histograms, probabilities = self.dataset.S_star_statistics(self.dataset.features)
+        self.assertListEqual(histograms.tolist(), [[2, 0, 1], [1, 1, 2], [1, 0, 2]])
+        np.testing.assert_allclose(probabilities, [0.55, 0.9, 0.4])
+
+        histograms, probabilities = self.dataset.S_star_statistics(["t2", "t3"], self.dataset.S_star["t1"])
+        self.assertListEqual(histograms.tolist(), [[1, 0, 1], [1, 0, 1]])
+        np.testing.assert_allclose(probabilities, [0.45, 0.35])
+
+    def test_intersections(self) -> None:
+        dataset_copy = self.dataset.copy()
+        self.assertListEqual(dataset_copy.S_star_intersection_for_features(["t1", "t3"]).tolist(), [0, 3])
+        self.assertEqual((dataset_copy.intersections.hits, dataset_copy.intersections.misses), (0, 1))
+
+        # A U {t} is extended from the cached A, and the order of the features does not matter
+        self.assertListEqual(dataset_copy.S_star_intersection_for_features(["t1", "t3", "t2"]).tolist(), [3])
+        self.assertListEqual(dataset_copy.S_star_intersection_for_features(["t3", "t1"]).tolist(), [0, 3])
+        self.assertListEqual(dataset_copy.S_star_intersection_for_features(["t1"]).tolist(), [0, 1, 3])
+        self.assertEqual((dataset_copy.intersections.hits, dataset_copy.intersections.misses), (2, 2))
+        self.assertEqual(len(dataset_copy.intersections), 3)
+
+        dataset_copy.drop_row(3)
+        self.assertListEqual(dataset_copy.S_star_intersection_for_features(["t1", "t3"]).tolist(), [0])
+        self.assertEqual(dataset_copy.intersections.misses, 1)
+
+        intersections = Dataset.Intersections(maxsize=2)
+        for features in [["t1"], ["t2"], ["t3"]]:
+            intersections.intersection(features, self.dataset.S_star)
+        self.assertEqual(len(intersections), 2)
+
     def test_labels_for(self) -> None:
         for feature in self.dataset.features:
             self.assertEqual(
@@ -0,0 +1,163 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from time import monotonic
+from typing import Optional
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from src.dataset import Dataset
+from src.decision_tree import DecisionTree, _init_build_worker
+from src.scheduling import SCHEDULING_POLICIES, BuildContext, SubproblemCache
+from src.tree import Tree
+from src.utils import label_test_leaves, prune, remove_exceeding_nodes, set_depths
+from tests.utils import fit_model, tree_nodes
+
+
+class TestDecisionTree(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.dataset = Dataset(Path("data/test.csv"))
+
+    def build(self, max_depth: Optional[int] = None, costs: Optional[dict[str, float]] = None) -> Tree:
+        context = BuildContext(self.dataset.features, costs or self.dataset.costs, max_depth)
+        tree, _ = DecisionTree()._build_decision_tree(context, self.dataset, self.dataset.features)
+
+        return tree
+
+    def fit(self, **kwargs) -> Tree:
+        return fit_model(self.dataset, **kwargs).decision_tree
+
+    def test_depth_aware_build(self) -> None:
+        tree = self.build()
+        set_depths(tree.structure, tree.root)
+        remove_exceeding_nodes(tree, self.dataset, 1)
+
+        depth_aware_tree = self.build(max_depth=1)
+        label_test_leaves(depth_aware_tree, self.dataset)
+
+        self.assertListEqual(tree_nodes(depth_aware_tree), tree_nodes(tree))
+        self.assertTrue(any(
+            depth_aware_tree.structure.nodes[leaf].get("depth_closed", False) for leaf in depth_aware_tree.leaves
+        ))
+
+    def test_max_depth(self) -> None:
+        # The depth at which a depth-aware fit closes the nodes is also the one at which it prunes them
+        tree = self.fit(max_depth=1)
+        self.assertLessEqual(max(tree.structure.nodes[leaf]["depth"] for leaf in tree.leaves), 1)
+        depth_aware_fit = fit_model(self.dataset, max_depth=1, depth_aware=True)
+        self.assertListEqual(tree_nodes(depth_aware_fit.decision_tree), tree_nodes(tree))
+
+        # The nodes closed at the maximum depth are not truncated by a limit
+        self.assertIsNone(depth_aware_fit.limit)
+        self.assertEqual(depth_aware_fit.truncated_objects, 0)
+
+    def test_skipped_budget_search(self) -> None:
+        # Every search is skipped, so every subproblem reuses the budget of the root, the cost of all the tests
+        with patch("src.decision_tree.find_budget", return_value=self.dataset.total_cost) as find_budget:
+            tree = self.build()
+
+        decision_tree = DecisionTree()
+        decision_tree.min_search_pairs = self.dataset.pairs_number + 1
+        context = BuildContext(self.dataset.features, self.dataset.costs)
+        skipping_tree, _ = decision_tree._build_decision_tree(context, self.dataset, self.dataset.features)
+
+        self.assertListEqual(tree_nodes(skipping_tree), tree_nodes(tree))
+        self.assertGreater(decision_tree.skipped_searches, 0)
+        self.assertEqual(decision_tree.skipped_searches, find_budget.call_count)
+
+    def test_shared_subproblem_cache(self) -> None:
+        def build(decision_tree: DecisionTree) -> None:
+            context = BuildContext(self.dataset.features, self.dataset.costs, subproblems=subproblems)
+            decision_tree._build_decision_tree(context, self.dataset, self.dataset.features)
+
+        subproblems = SubproblemCache()
+        skipping_tree = DecisionTree()
+        skipping_tree.min_search_pairs = self.dataset.pairs_number + 1
+        build(skipping_tree)
+
+        # The backbones are only shared by builds with the same budget search settings
+        misses = subproblems.misses
+        build(DecisionTree())
+        self.assertEqual(subproblems.hits, 0)
+
+        misses = subproblems.misses - misses
+        build(DecisionTree())
+        self.assertEqual(subproblems.hits, misses)
+
+    def test_concurrent_builds(self) -> None:
+        settings = [(None, None), (1, None), (None, {"t1": 3.0, "t2": 1.0, "t3": 2.0})] * 4
+        expected = [tree_nodes(self.build(*setting)) for setting in settings]
+
+        with ThreadPoolExecutor(4) as executor:
+            trees = list(executor.map(lambda setting: self.build(*setting), settings))
+
+        self.assertListEqual([tree_nodes(tree) for tree in trees], expected)
+        self.assertNotEqual(expected[0], expected[2])
+
+    def test_parallel_build(self) -> None:
+        self.assertListEqual(tree_nodes(self.fit(build_workers=2, min_dispatch_pairs=0)), tree_nodes(self.fit()))
+
+    def test_scheduling(self) -> None:
+        tree = tree_nodes(self.fit())
+        for scheduling in SCHEDULING_POLICIES:
+            self.assertListEqual(tree_nodes(self.fit(scheduling=scheduling)), tree)
+            self.assertListEqual(
+                tree_nodes(self.fit(build_workers=2, scheduling=scheduling, max_in_flight=1)), tree
+            )
+
+        with self.assertRaises(ValueError):
+            self.fit(scheduling="random")
+        with self.assertRaises(ValueError):
+            self.fit(build_workers=2, max_in_flight=0)
+
+    def test_anytime_build(self) -> None:
+        for limits, limit in [({"max_nodes": 1}, "nodes"), ({"deadline": monotonic()}, "deadline")]:
+            context = BuildContext(self.dataset.features, self.dataset.costs, **limits)
+            tree, _ = DecisionTree()._build_decision_tree(context, self.dataset, self.dataset.features)
+            self.assertEqual(context.limit, limit)
+
+            truncated_leaves = [leaf for leaf in tree.leaves if tree.structure.nodes[leaf].get("truncated", False)]
+            self.assertGreater(len(truncated_leaves), 0)
+
+            # The objects of every subproblem are in a leaf, so the tree can still be pruned
+            label_test_leaves(tree, self.dataset)
+            self.assertListEqual(
+                sorted(obj for leaf in tree.leaves for obj in tree.structure.nodes[leaf]["objects"]),
+                self.dataset.indexes.tolist()
+            )
+            prune(tree, self.dataset)
+
+        context = BuildContext(self.dataset.features, self.dataset.costs, max_nodes=100)
+        DecisionTree()._build_decision_tree(context, self.dataset, self.dataset.features)
+        self.assertIsNone(context.limit)
+
+    def test_backbone_limits(self) -> None:
+        # A deadline passed during the budget search of the root ends it, and the whole dataset is closed as a leaf
+        context = BuildContext(self.dataset.features, self.dataset.costs, deadline=monotonic())
+        tree, _ = DecisionTree()._build_decision_tree(context, self.dataset, self.dataset.features)
+        self.assertEqual(tree.structure.number_of_nodes(), 1)
+        self.assertTrue(tree.structure.nodes[tree.root]["truncated"])
+
+        # The pending subproblems are counted as leaves, so the node budget is never exceeded
+        for max_nodes in range(1, 12):
+            context = BuildContext(self.dataset.features, self.dataset.costs, max_nodes=max_nodes)
+            tree, _ = DecisionTree()._build_decision_tree(context, self.dataset, self.dataset.features)
+            self.assertLessEqual(tree.structure.number_of_nodes(), max_nodes)
+
+    def test_parallel_node_budget(self) -> None:
+        # The subproblems are all dispatched at once, each one given the nodes left after the root backbone
+        decision_tree = DecisionTree()
+        context = BuildContext(self.dataset.features, self.dataset.costs, max_nodes=7)
+        with ThreadPoolExecutor(
+                4, initializer=_init_build_worker,
+                initargs=(DecisionTree(), self.dataset, BuildContext(self.dataset.features, self.dataset.costs))
+        ) as executor:
+            decision_tree._executor = executor
+            tree, _ = decision_tree._build_decision_tree(context, self.dataset, self.dataset.features)
+
+        self.assertLessEqual(tree.structure.number_of_nodes(), 7)
+        self.assertEqual(context.limit, "nodes")
+
+
+if __name__ == "__main__":
+    main()
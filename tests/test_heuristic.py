@@ -0,0 +1,131 @@
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Optional
+from unittest import TestCase, main
+
+from src.budget import find_budget
+from src.dataset import Dataset
+from src.heuristic import BreakpointWolseyHeuristic, GreedySequence, wolsey_greedy_heuristic
+from src.maximization import LazySubmodularMaximization, submodular_maximization
+from src.types import Bounds
+from src.utils import _bisection_budgets, binary_search_budget, budget_executor, submodular_function_1
+
+
+class TestHeuristic(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.dataset = Dataset(Path("data/test.csv"))
+
+    def test_lazy_maximization(self) -> None:
+        lazy_maximization = LazySubmodularMaximization()
+
+        heuristic_features = self.dataset.features.copy()
+        auxiliary_features: list[str] = []
+        while heuristic_features:
+            expected = submodular_maximization(
+                self.dataset, self.dataset.costs, heuristic_features, auxiliary_features
+            )
+            chosen = lazy_maximization(self.dataset, self.dataset.costs, heuristic_features, auxiliary_features)
+            self.assertEqual(chosen, expected)
+
+            auxiliary_features.append(heuristic_features.pop(heuristic_features.index(chosen)))
+
+        self.assertLessEqual(lazy_maximization.evaluations, 6)
+
+    def test_lazy_heuristic(self) -> None:
+        for budget in [1.0, 2.0, 3.0]:
+            self.assertListEqual(
+                wolsey_greedy_heuristic(
+                    budget, self.dataset, self.dataset.features, self.dataset.costs, submodular_function_1, lazy=True
+                ),
+                wolsey_greedy_heuristic(
+                    budget, self.dataset, self.dataset.features, self.dataset.costs, submodular_function_1, lazy=False
+                )
+            )
+
+    def test_breakpoint_heuristic(self) -> None:
+        heuristic = BreakpointWolseyHeuristic()
+        for budget in [2.0, 1.0, 3.0, 1.5]:
+            self.assertListEqual(
+                heuristic(budget, self.dataset, self.dataset.features, self.dataset.costs, submodular_function_1),
+                wolsey_greedy_heuristic(
+                    budget, self.dataset, self.dataset.features, self.dataset.costs, submodular_function_1
+                )
+            )
+
+        # All the tests cost 1, so every budget falls on the same breakpoint
+        self.assertEqual(heuristic.runs, 1)
+        self.assertListEqual(
+            heuristic(0.5, self.dataset, self.dataset.features, self.dataset.costs, submodular_function_1), []
+        )
+
+    def test_greedy_sequence(self) -> None:
+        sequence = GreedySequence(
+            self.dataset, self.dataset.features, self.dataset.costs, LazySubmodularMaximization(),
+            submodular_function_1
+        )
+        self.assertEqual(len(sequence.prefix(1.0)), 2)
+        self.assertEqual(len(sequence.chosen), 2)
+
+        self.assertListEqual(sequence.prefix(0.5), sequence.chosen[:1])
+        self.assertListEqual(sequence.prefix(5.0), sequence.chosen)
+        self.assertListEqual(sequence.spent, [1.0, 2.0, 3.0])
+        self.assertListEqual(
+            sequence.coverage,
+            [submodular_function_1(self.dataset, sequence.chosen[:k]) for k in range(len(sequence.chosen) + 1)]
+        )
+
+    def test_parallel_budget_search(self) -> None:
+        def search(upper: float, workers: int = 1, executor: Optional[Executor] = None) -> float:
+            return binary_search_budget(
+                self.dataset, self.dataset.features, self.dataset.costs, Bounds(1.0, upper),
+                BreakpointWolseyHeuristic(), workers, executor
+            )
+
+        self.assertEqual(find_budget(self.dataset, self.dataset.features, self.dataset.costs), 2.5)
+
+        # Probing the first budgets of the bisection at once ends on the budget of the plain binary search, whether or
+        # not the workers fill whole levels
+        with budget_executor(self.dataset, 2) as executor:
+            for upper in [self.dataset.total_cost, 2.0, 10.0, 100.0]:
+                for workers in [1, 2, 3, 5, 7]:
+                    self.assertEqual(search(upper, workers, executor), search(upper))
+
+        # A stopped search ends on the budget reached so far
+        self.assertEqual(
+            binary_search_budget(
+                self.dataset, self.dataset.features, self.dataset.costs, Bounds(1.0, 10.0),
+                BreakpointWolseyHeuristic(), stop=lambda: True
+            ),
+            10.0
+        )
+
+        self.assertListEqual(_bisection_budgets(0.0, 8.0, 1), [4.0])
+        self.assertListEqual(_bisection_budgets(0.0, 8.0, 4), [4.0, 2.0, 6.0, 1.0])
+
+    def test_budget_upper_bound(self) -> None:
+        self.assertEqual(find_budget(self.dataset, self.dataset.features, self.dataset.costs, upper_bound=1.5), 1.5)
+        self.assertEqual(find_budget(self.dataset, self.dataset.features, self.dataset.costs, upper_bound=10.0), 2.5)
+
+    def test_stochastic_heuristic(self) -> None:
+        def heuristic(budget: float, epsilon: float, seed: int) -> list[str]:
+            return wolsey_greedy_heuristic(
+                budget, self.dataset, self.dataset.features, self.dataset.costs, submodular_function_1,
+                epsilon=epsilon, seed=seed
+            )
+
+        # A small enough epsilon samples all the features
+        self.assertListEqual(
+            heuristic(2.0, 1e-6, 0),
+            wolsey_greedy_heuristic(
+                2.0, self.dataset, self.dataset.features, self.dataset.costs, submodular_function_1
+            )
+        )
+        self.assertListEqual(heuristic(3.0, 0.5, 42), heuristic(3.0, 0.5, 42))
+
+        with self.assertRaises(ValueError):
+            heuristic(1.0, 1.5, 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from pickle import dumps, loads
+from unittest import TestCase, main
+
+from src.object_set import ObjectSet
+
+
+class TestObjectSet(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.size = 130
+        cls.first = ObjectSet.from_indexes([0, 3, 64, 65, 129], cls.size)
+        cls.second = ObjectSet.from_indexes([3, 5, 65, 128], cls.size)
+
+    def test_fields(self) -> None:
+        self.assertEqual(self.first.size, self.size)
+        self.assertEqual(len(self.first), 5)
+        self.assertListEqual(self.first.tolist(), [0, 3, 64, 65, 129])
+        self.assertListEqual(list(self.second), [3, 5, 65, 128])
+        self.assertFalse(ObjectSet.empty(self.size))
+
+    def test_operators(self) -> None:
+        self.assertListEqual((self.first & self.second).tolist(), [3, 65])
+        self.assertListEqual((self.first | self.second).tolist(), [0, 3, 5, 64, 65, 128, 129])
+        self.assertListEqual((self.first - self.second).tolist(), [0, 64, 129])
+
+    def test_equality(self) -> None:
+        self.assertEqual(self.first, ObjectSet.from_indexes([129, 65, 64, 3, 0], self.size))
+        self.assertNotEqual(self.first, self.second)
+        self.assertEqual(loads(dumps(self.first)), self.first)
+
+    def test_contains(self) -> None:
+        for index in [0, 3, 64, 65, 129]:
+            self.assertIn(index, self.first)
+
+        for index in [1, 63, 128, 130, -1]:
+            self.assertNotIn(index, self.first)
+
+
+if __name__ == '__main__':
+    main()
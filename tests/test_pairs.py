@@ -27,6 +27,30 @@ class TestPairs(TestCase):
             1
         )
 
+    def test_pairs_number_for_many(self) -> None:
+        self.assertListEqual(
+            self.dataset.pairs_number_for_many([[0, 1, 3], [2, 4], [], [0, 1, 2, 3, 4]]).tolist(),
+            [2, 1, 0, 8]
+        )
+
+    def test_iteration(self) -> None:
+        self.assertListEqual(list(self.dataset.pairs), self.dataset.pairs_list)
+
+    def test_contains(self) -> None:
+        for pair in [(0, 2), (2, 0), (1, 4), (2, 3)]:
+            self.assertIn(pair, self.dataset.pairs)
+
+        for pair in [(0, 1), (3, 4), (0, 5)]:
+            self.assertNotIn(pair, self.dataset.pairs)
+
+    def test_drop(self) -> None:
+        dataset_copy = self.dataset.copy()
+        dataset_copy.drop_row(2)
+
+        self.assertEqual(dataset_copy.pairs_number, 4)
+        self.assertListEqual(dataset_copy.pairs_list, [(0, 3), (0, 4), (1, 3), (1, 4)])
+        self.assertNotIn((0, 2), dataset_copy.pairs)
+
 
 if __name__ == '__main__':
     main()
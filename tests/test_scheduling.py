@@ -0,0 +1,62 @@
+from unittest import TestCase, main
+
+from src.object_set import ObjectSet
+from src.scheduling import BreadthFirstQueue, BuildTask, DepthFirstQueue, LargestFirstQueue, SubproblemCache
+from src.tree import Tree
+
+
+class TestScheduling(TestCase):
+    def setUp(self) -> None:
+        self.tasks = [
+            BuildTask(ObjectSet.from_indexes([index], 5), [], pairs_number)
+            for index, pairs_number in enumerate([3, 7, 3, 1])
+        ]
+
+    def drain(self, queue) -> list[int]:
+        for task in self.tasks:
+            queue.push(task)
+
+        order = []
+        while len(queue) > 0:
+            order.append(queue.pop().objects.tolist()[0])
+
+        return order
+
+    def test_depth_first(self) -> None:
+        self.assertListEqual(self.drain(DepthFirstQueue()), [3, 2, 1, 0])
+
+    def test_breadth_first(self) -> None:
+        self.assertListEqual(self.drain(BreadthFirstQueue()), [0, 1, 2, 3])
+
+    def test_largest_first(self) -> None:
+        self.assertListEqual(self.drain(LargestFirstQueue()), [1, 0, 2, 3])
+
+    def test_subproblem_cache(self) -> None:
+        cache = SubproblemCache(maxsize=2)
+        for key in ["a", "b", "c"]:
+            self.assertIsNone(cache.get(key))
+            cache.put(key, (Tree(), []))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+        self.assertAlmostEqual(cache.hit_rate, 0.2)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 1)
+
+    def test_relabelled_tree(self) -> None:
+        tree = Tree()
+        root = tree.add_node([0, 1], 1, "t1")
+        leaf = tree.add_node([0], 0, "A", root, "1")
+
+        relabelled, mapping = tree.relabelled()
+        self.assertEqual(relabelled.get_label_of_node(mapping[leaf]), "A")
+        self.assertEqual(relabelled.root, mapping[root])
+        self.assertTrue(set(relabelled.structure.nodes).isdisjoint(tree.structure.nodes))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,10 @@ class TestSeparation(TestCase):
 
     def test_fields(self) -> None:
         self.assertDictEqual(
-            self.dataset.S_label,
+            {
+                feature: {label: objects.tolist() for label, objects in labels.items()}
+                for feature, labels in self.dataset.S_label.items()
+            },
             {
                 "t1": {
                     "1": [0, 1, 3],
@@ -29,7 +32,7 @@ class TestSeparation(TestCase):
         )
 
         self.assertDictEqual(
-            self.dataset.S_star,
+            {feature: objects.tolist() for feature, objects in self.dataset.S_star.items()},
             {
                 "t1": [0, 1, 3],
                 "t2": [1, 2, 3, 4],
@@ -38,7 +41,7 @@ class TestSeparation(TestCase):
         )
 
         self.assertDictEqual(
-            self.dataset.sigma,
+            {feature: objects.tolist() for feature, objects in self.dataset.sigma.items()},
             {
                 "t1": [2, 4],
                 "t2": [0],
@@ -46,6 +49,22 @@ class TestSeparation(TestCase):
             }
         )
 
+    def test_kept_and_separated(self) -> None:
+        self.assertDictEqual(self.dataset.kept_number, {"t1": 1, "t2": 0, "t3": 1})
+        self.assertDictEqual(self.dataset.separated_number, {"t1": 5, "t2": 3, "t3": 5})
+
+        self.assertListEqual([pair for pair in self.dataset.pairs if self.dataset.keeps("t1", pair)], [(2, 4)])
+        self.assertListEqual(
+            [pair for pair in self.dataset.pairs if self.dataset.separates("t2", pair)],
+            [(0, 2), (0, 3), (0, 4)]
+        )
+        self.assertFalse(self.dataset.separates("t1", (0, 1)))
+
+    def test_covered_pairs_number(self) -> None:
+        self.assertEqual(self.dataset.covered_pairs_number_for([]), 0)
+        self.assertEqual(self.dataset.covered_pairs_number_for(["t1"]), 6)
+        self.assertEqual(self.dataset.covered_pairs_number_for(["t1", "t2"]), 7)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,33 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from src.dataset import Dataset
+from src.decision_tree import DecisionTree
+from src.tree import Tree
+
+
+def fit_model(dataset: Dataset, **kwargs) -> DecisionTree:
+    """Fits a decision tree on all the features of the dataset, saving the model in a temporary directory"""
+    decision_tree = DecisionTree()
+
+    # The model is saved next to the sources
+    with TemporaryDirectory() as directory, patch("src.decision_tree.dirname", return_value=f"{directory}/src"):
+        os.makedirs(f"{directory}/src")
+        os.makedirs(f"{directory}/model/test/0")
+        decision_tree.fit(dataset, dataset.features, dataset.costs, "test", 0, **kwargs)
+
+    return decision_tree
+
+
+def tree_nodes(tree: Tree, node=None) -> list:
+    """The label, the objects and the children of each node, which identify a tree regardless of its node identifiers"""
+    node = tree.root if node is None else node
+    return [
+        tree.get_label_of_node(node),
+        sorted(tree.structure.nodes[node]["objects"]),
+        sorted(
+            (tree.structure.get_edge_data(node, child)["label"], tree_nodes(tree, child))
+            for child in tree.structure.successors(node)
+        )
+    ]